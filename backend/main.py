@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from urllib.parse import quote
 import time
@@ -19,6 +20,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Session partagée : connexions keep-alive réutilisées d'une requête à l'autre
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_maxsize=10))
+
 class ScrapeRequest(BaseModel):
     search_query: str
     num_products: Optional[int] = 20
@@ -33,7 +38,7 @@ def scrape_meta_ads(search_query, num_ads=20, delay=2):
     ads = []
 
     try:
-        response = requests.get(base_url, headers=headers)
+        response = session.get(base_url, headers=headers)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scraping par lots avec ordonnancement équitable entre domaines
+Chaque domaine Amazon a ses propres workers : les domaines avancent en parallèle,
+et les requêtes d'un même domaine sont entrelacées page par page, jusqu'à
+DOMAIN_CONCURRENCY pages en vol, au rythme du limiteur adaptatif de ce domaine
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from exporters import Exporter, create_exporter, get_exporter_class
+from metrics import SCRAPES_IN_PROGRESS
+from product_record import Product
+from scrape_products_enhanced import (
+    DOMAIN_CONCURRENCY, SeenAsins, finalize_results, get_amazon_domain, iter_product_pages, resolve_lang_code,
+    save_page
+)
+
+class BatchQuery:
+    """Une requête du lot et son état d'avancement"""
+
+    def __init__(self, index: int, search_query: str, lang_code: str, num_products: int,
+                 export_format: Optional[str] = None):
+        self.index = index
+        self.num_products = num_products
+        self.search_query = search_query
+        self.lang_code = lang_code
+        self.export_format = export_format
+        self.seen = SeenAsins()
+        self.pages = iter_product_pages(search_query, num_products, market=lang_code, seen=self.seen)
+        self.exporter: Optional[Exporter] = None  # Ouvert à la première page (lots jusqu'à 500 requêtes)
+        self.products: List[Product] = []
+        self.pages_done = 0
+        self.error: Optional[str] = None
+        self.in_progress = False  # Comptée dans SCRAPES_IN_PROGRESS (de sa première page à son résultat)
+
+    def start(self):
+        if not self.in_progress:
+            self.in_progress = True
+            SCRAPES_IN_PROGRESS.inc()
+
+    def finish(self):
+        if self.in_progress:
+            self.in_progress = False
+            SCRAPES_IN_PROGRESS.dec()
+
+    def open_exporter(self) -> Exporter:
+        if self.exporter is None:
+            self.exporter = create_exporter(self.search_query, self.export_format)
+        return self.exporter
+
+    def fail(self, error: Exception):
+        """Arrête la requête sur une erreur (les autres requêtes du lot continuent)"""
+        self.error = str(error)
+        self.pages.close()
+        if self.exporter is not None:
+            exporter, self.exporter = self.exporter, None
+            try:
+                exporter.close()
+            except Exception:
+                pass  # Erreur d'écriture déjà enregistrée dans self.error
+
+    def save(self, page_products: List[Product]):
+        """Ajoute une page aux produits, au fichier d'export et à la base produits"""
+        self.products.extend(page_products)
+        save_page(self.open_exporter(), page_products, self.search_query, self.lang_code)
+        self.pages_done += 1
+
+    def result(self) -> Dict:
+        """Résultat final de la requête (même format que scrape_products, plus le marché)"""
+        try:
+            if self.error is not None:
+                if self.exporter is not None:
+                    self.exporter.close()
+                result = {'products': self.products, 'stats': {}, 'success': False, 'error': self.error}
+            else:
+                result = finalize_results(self.products, self.search_query, self.lang_code,
+                                          verbose=False, return_stats=True, exporter=self.open_exporter(),
+                                          duplicates=self.seen.duplicates, pages=self.seen.pages)
+        finally:
+            self.finish()
+        result['search_query'] = self.search_query
+        result['market'] = self.lang_code
+        result['pages_done'] = self.pages_done
+        return result
+
+def advance(query: BatchQuery) -> bool:
+    """Scrape la page suivante d'une requête, retourne True si la requête est terminée"""
+    query.start()
+    try:
+        _, page_products = next(query.pages)
+    except StopIteration:
+        return True
+    except Exception as e:
+        query.fail(e)
+        return True
+
+    try:
+        query.save(page_products)
+    except Exception as e:  # Export ou base produits (disque plein, SQLite verrouillée...)
+        query.fail(e)
+        return True
+    return len(query.products) >= query.num_products
+
+def run_domain(queries: List[BatchQuery], concurrency: int = DOMAIN_CONCURRENCY) -> Dict[int, Dict]:
+    """
+    Workers d'un domaine : une page par requête à tour de rôle (round-robin),
+    jusqu'à `concurrency` requêtes différentes en vol ; chaque requête HTTP attend
+    son jeton auprès du limiteur du domaine, seule borne du débit
+    """
+    results = {}
+    pending = deque(queries)
+    lock = threading.Lock()
+
+    def worker():
+        # Une requête n'est tenue que par un worker à la fois (son générateur n'est pas partagé) ;
+        # un worker s'arrête quand il ne reste plus de requête en attente
+        while True:
+            with lock:
+                if not pending:
+                    return
+                query = pending.popleft()
+            if advance(query):
+                result = query.result()
+                with lock:
+                    results[query.index] = result
+            else:
+                with lock:
+                    pending.append(query)
+
+    workers = min(concurrency, len(queries))
+    if workers <= 1:
+        worker()
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-page') as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+    return results
+
+def scrape_batch(queries: List[str], markets: Optional[List[Optional[str]]] = None,
+                 num_products: int = 50, delay: float = 2, export_format: Optional[str] = None) -> List[Dict]:
+    """
+    Scrape une liste de requêtes en parallélisant les domaines Amazon
+
+    Args:
+        queries: Termes de recherche
+        markets: Marché imposé par requête (None = détection automatique), même longueur que queries
+        num_products: Nombre de produits par requête
+        delay: Conservé pour compatibilité (le rythme est fixé par le limiteur de chaque domaine)
+        export_format: Format des fichiers d'export (csv, csv.gz, ndjson, parquet, arrow)
+
+    Returns:
+        Un résultat par requête, dans l'ordre de `queries`
+    """
+    markets = markets or [None] * len(queries)
+    if len(markets) != len(queries):
+        raise ValueError("markets doit avoir autant d'éléments que queries")
+    get_exporter_class(export_format)  # Format inconnu : erreur avant de créer des fichiers
+
+    by_domain: Dict[str, List[BatchQuery]] = {}
+    for index, (search_query, market) in enumerate(zip(queries, markets)):
+        lang_code = resolve_lang_code(search_query, market)
+        query = BatchQuery(index, search_query, lang_code, num_products, export_format)
+        by_domain.setdefault(get_amazon_domain(lang_code), []).append(query)
+
+    results: Dict[int, Dict] = {}
+    try:
+        if by_domain:
+            with ThreadPoolExecutor(max_workers=len(by_domain), thread_name_prefix='batch-domain') as executor:
+                for domain_results in executor.map(run_domain, by_domain.values()):
+                    results.update(domain_results)
+    finally:
+        # Lot interrompu : les requêtes commencées ne sont plus en cours
+        for domain_queries in by_domain.values():
+            for query in domain_queries:
+                query.finish()
+
+    return [results[index] for index in range(len(queries))]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'analyse des pages de résultats, hors ligne
+
+Mesure, sur le corpus de benchmarks/fixtures, le chemin d'extraction de
+scrape_products (parse_products_page : blocs, champs, produits) en pages/s et
+produits/s, puis le coût de chaque sélecteur de get_robust_selectors() par bloc.
+Les temps sont comparés à benchmarks/baseline.json, ramenés à la vitesse de la
+machine par une mesure d'étalonnage ; le script échoue (code 1) si le débit
+total ralentit au-delà du seuil ou une page au-delà du seuil par page (plus
+large : une page isolée de quelques ms est sensible au bruit de la machine)
+et que la mesure de confirmation le confirme, et (code 2) si une page ne donne plus le nombre de produits attendu.
+
+Usage :
+    python benchmarks/bench_parse.py                      # mesure et compare
+    python benchmarks/bench_parse.py --update-baseline    # enregistre la référence
+    python benchmarks/bench_parse.py --modes lxml bs4 --json rapport.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import scrape_products_enhanced as scraper  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Ralentissement toléré par rapport à la référence (0.25 = 25 %) : débit total, puis par page
+DEFAULT_THRESHOLD = float(os.environ.get('SCRAPER_BENCH_THRESHOLD', '0.25'))
+DEFAULT_PAGE_THRESHOLD = float(os.environ.get('SCRAPER_BENCH_PAGE_THRESHOLD', '1.0'))
+
+# Modes mesurés : analyse restreinte lxml (production), arbre complet lxml, BeautifulSoup
+MODES = {
+    'lxml': {'LXML_AVAILABLE': True, 'RESTRICTED_PARSE': True},
+    'lxml-full': {'LXML_AVAILABLE': True, 'RESTRICTED_PARSE': False},
+    'bs4': {'LXML_AVAILABLE': False, 'RESTRICTED_PARSE': False}
+}
+
+def load_corpus() -> List[Dict]:
+    """Pages du corpus (manifest.json) avec leur HTML décompressé"""
+    with open(os.path.join(FIXTURES_DIR, 'manifest.json'), encoding='utf-8') as file:
+        manifest = json.load(file)
+    for entry in manifest:
+        with gzip.open(os.path.join(FIXTURES_DIR, entry['file'])) as file:
+            entry['html'] = file.read().decode('utf-8')
+    return manifest
+
+def calibrate(rounds: int = 5) -> float:
+    """Durée d'un travail Python fixe (meilleure de `rounds`), pour comparer des machines"""
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        total = 0
+        for index in range(300000):
+            total += len(str(index)) * (index & 7)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def best_time(function, number: int, repeat: int) -> float:
+    """Meilleur temps moyen d'un appel sur `repeat` séries de `number` appels"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+def bench_pages(corpus: List[Dict], mode: str, number: int, repeat: int) -> Dict:
+    """Temps par page et débits d'un mode d'analyse"""
+    saved = {name: getattr(scraper, name) for name in MODES[mode]}
+    for name, value in MODES[mode].items():
+        setattr(scraper, name, value)
+    try:
+        pages = {}
+        for entry in corpus:
+            def parse(entry=entry):
+                return scraper.parse_products_page(entry['html'], entry['base_domain'], entry['market'])
+            parsed = parse()  # Plan de sélecteurs du domaine en place, comme en production
+            seconds = best_time(parse, number, repeat)
+            count = len(parsed.products) if parsed else 0
+            pages[entry['name']] = {
+                'ms_per_page': round(seconds * 1000, 3),
+                'items': count,
+                'items_per_second': round(count / seconds, 1),
+                'kilobytes': len(entry['html']) // 1024
+            }
+    finally:
+        for name, value in saved.items():
+            setattr(scraper, name, value)
+
+    seconds = sum(page['ms_per_page'] for page in pages.values()) / 1000
+    items = sum(page['items'] for page in pages.values())
+    return {
+        'pages': pages,
+        'pages_per_second': round(len(pages) / seconds, 1),
+        'items_per_second': round(items / seconds, 1)
+    }
+
+def bench_selectors(corpus: List[Dict], repeat: int) -> Dict:
+    """
+    Coût de chaque sélecteur de get_robust_selectors(), appliqué à tous les blocs
+    du corpus : microsecondes par bloc et part des blocs où il trouve une valeur
+    """
+    if not scraper.LXML_AVAILABLE:
+        return {}
+
+    extractor = scraper.get_compiled_extractor()
+    blocks = []
+    for entry in corpus:
+        root = extractor.parse(entry['html'])
+        blocks.extend((item, entry['base_domain']) for item in extractor.find_items(root))
+
+    report = {}
+    for field, selectors in scraper.get_robust_selectors().items():
+        report[field] = []
+        for index, selector in enumerate(selectors):
+            def run(field=field, index=index):
+                return [extractor.value(field, index, item, base_url) for item, base_url in blocks]
+            hits = sum(value is not None for value in run())
+            seconds = best_time(run, 1, repeat)
+            report[field].append({
+                'selector': selector,
+                'us_per_item': round(seconds / len(blocks) * 1e6, 2),
+                'hit_ratio': round(hits / len(blocks), 3)
+            })
+    return report
+
+def compare(results: Dict, baseline: Dict, calibration: float, threshold: float,
+            page_threshold: float) -> List[str]:
+    """Ralentissements au-delà des seuils, temps de référence ramenés à la machine courante"""
+    scale = calibration / baseline['calibration_seconds']
+    regressions = []
+    for mode, reference in baseline['modes'].items():
+        if mode not in results:
+            continue
+        current = results[mode]
+        for name, page in reference['pages'].items():
+            measured = current['pages'].get(name)
+            if measured is None:
+                continue
+            allowed = page['ms_per_page'] * scale * (1 + page_threshold)
+            if measured['ms_per_page'] > allowed:
+                regressions.append(f"{mode}/{name}: {measured['ms_per_page']:.3f} ms/page "
+                                   f"(référence {page['ms_per_page'] * scale:.3f}, max {allowed:.3f})")
+        allowed = reference['items_per_second'] / scale / (1 + threshold)
+        if current['items_per_second'] < allowed:
+            regressions.append(f"{mode}: {current['items_per_second']:.0f} produits/s "
+                               f"(référence {reference['items_per_second'] / scale:.0f}, min {allowed:.0f})")
+    return regressions
+
+def check_counts(results: Dict, corpus: List[Dict]) -> List[str]:
+    """Pages dont le nombre de produits extraits ne correspond plus au corpus"""
+    expected = {entry['name']: entry['unique_asins'] for entry in corpus}
+    return [f"{mode}/{name}: {page['items']} produits, {expected[name]} attendus"
+            for mode, result in results.items()
+            for name, page in result['pages'].items()
+            if page['items'] != expected[name]]
+
+def print_report(results: Dict, selectors: Dict, calibration: float):
+    print(f"Étalonnage : {calibration * 1000:.1f} ms")
+    for mode, result in results.items():
+        print(f"\n[{mode}] {result['pages_per_second']:.0f} pages/s, {result['items_per_second']:.0f} produits/s")
+        for name, page in result['pages'].items():
+            print(f"  {name:<14} {page['kilobytes']:>5} Ko  {page['ms_per_page']:>8.3f} ms/page  "
+                  f"{page['items']:>3} produits  {page['items_per_second']:>9.0f} produits/s")
+    if selectors:
+        print("\nCoût des sélecteurs (µs par bloc, part des blocs trouvés) :")
+        for field, entries in selectors.items():
+            print(f"  {field}")
+            for index, entry in enumerate(entries):
+                print(f"    {index} {entry['us_per_item']:>7.2f} µs  {entry['hit_ratio']:>6.1%}  {entry['selector']}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne de l'analyse des pages de résultats")
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=['lxml', 'lxml-full'])
+    parser.add_argument('--number', type=int, default=5, help="Appels par série")
+    parser.add_argument('--repeat', type=int, default=5, help="Séries (le meilleur temps est retenu)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Ralentissement toléré du débit total (0.25 = 25 %%)")
+    parser.add_argument('--page-threshold', type=float, default=DEFAULT_PAGE_THRESHOLD,
+                        help="Ralentissement toléré par page (1.0 = 100 %%)")
+    parser.add_argument('--confirm', type=int, default=2,
+                        help="Nouvelles mesures (étalonnage compris) avant de conclure à un ralentissement")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help="Enregistre les mesures comme référence")
+    parser.add_argument('--json', help="Écrit le rapport complet dans ce fichier")
+    args = parser.parse_args(argv)
+
+    if not scraper.LXML_AVAILABLE:
+        args.modes = [mode for mode in args.modes if mode == 'bs4'] or ['bs4']
+
+    corpus = load_corpus()
+    scraper.warm_up_parser()
+    calibration = calibrate()
+    results = {mode: bench_pages(corpus, mode, args.number, args.repeat) for mode in args.modes}
+    selectors = bench_selectors(corpus, args.repeat)
+    print_report(results, selectors, calibration)
+
+    report = {'calibration_seconds': round(calibration, 5), 'modes': results, 'selectors': selectors}
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+    mismatches = check_counts(results, corpus)
+    if mismatches:
+        print("\n❌ Produits extraits différents du corpus :")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        return 2
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({'calibration_seconds': report['calibration_seconds'], 'modes': results},
+                      file, ensure_ascii=False, indent=2)
+            file.write('\n')
+        print(f"\n💾 Référence enregistrée : {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️ Pas de référence ({args.baseline}) : relancer avec --update-baseline")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, calibration, args.threshold, args.page_threshold)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        # Ralentissement passager de la machine : nouvel étalonnage et nouvelle mesure
+        calibration = calibrate()
+        results = {mode: bench_pages(corpus, mode, args.number, args.repeat) for mode in args.modes}
+        regressions = compare(results, baseline, calibration, args.threshold, args.page_threshold)
+    limits = f"{args.threshold:.0%} (total) / {args.page_threshold:.0%} (page)"
+    if regressions:
+        print(f"\n❌ Ralentissements au-delà de {limits} :")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\n✅ Aucun ralentissement au-delà de {limits}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Serveur Amazon local pour les tests de charge
+
+Un port par marché de AMAZON_DOMAINS (port de base + rang du marché), chacun
+servant /s?k=...&page=N à partir des pages du corpus benchmarks/fixtures, avec
+une latence, des taux d'erreur 429 / 503 et un nombre de pages réglables par
+marché. Les ASIN sont dérivés de la recherche et du numéro de page : chaque
+page apporte des produits distincts. Les réponses portent un ETag (304 sur
+If-None-Match).
+
+Le scraper est redirigé vers ce serveur par SCRAPER_AMAZON_DOMAINS, dont la
+valeur est affichée au démarrage. Usage :
+    python benchmarks/fake_amazon.py --port 8900 --latency-ms 150 --rate-429 0.02
+    python benchmarks/fake_amazon.py --config hosts.json   # {"fr": {"latency_ms": 300, "pages": 3}}
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from scrape_products_enhanced import AMAZON_DOMAINS  # noqa: E402
+
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+
+# Page du corpus servie par marché (les marchés sans page dédiée reprennent une page proche)
+MARKET_FIXTURES = {
+    'fr': 'fr_sponsored', 'en': 'en_list', 'de': 'de_grid', 'it': 'fr_grid', 'es': 'fr_grid',
+    'uk': 'uk_legacy', 'ca': 'en_list', 'jp': 'jp_grid', 'ar': 'ar_grid', 'in': 'in_range'
+}
+
+ASIN_PATTERN = re.compile(r'B0[0-9A-F]{8}')
+
+# Page sans résultat, servie au-delà de la dernière page
+EMPTY_PAGE = ('<!doctype html><html><body><div class="s-main-slot s-result-list">'
+              '<div class="s-no-outline">Aucun résultat</div></div></body></html>')
+
+DEFAULTS = {'latency_ms': 100.0, 'jitter_ms': 50.0, 'rate_429': 0.0, 'rate_503': 0.0, 'pages': 7}
+
+class MarketConfig:
+    """Comportement simulé d'un marché"""
+
+    def __init__(self, market: str, template: str, latency_ms: float, jitter_ms: float,
+                 rate_429: float, rate_503: float, pages: int):
+        self.market = market
+        self.template = template
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.rate_503 = rate_503
+        self.pages = pages
+
+class FakeAmazon:
+    """Serveurs HTTP des marchés et compteurs de requêtes"""
+
+    def __init__(self, configs: Dict[str, MarketConfig], host: str = '127.0.0.1', port: int = 8900,
+                 seed: int = 0):
+        self.configs = configs
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._servers: List[ThreadingHTTPServer] = []
+
+    def domains(self) -> Dict[str, str]:
+        """Domaine local de chaque marché"""
+        return {market: f"http://{self.host}:{self.port + index}"
+                for index, market in enumerate(AMAZON_DOMAINS) if market in self.configs}
+
+    def env_value(self) -> str:
+        """Valeur de SCRAPER_AMAZON_DOMAINS pointant vers ce serveur"""
+        return ','.join(f"{market}={domain}" for market, domain in self.domains().items())
+
+    def render(self, config: MarketConfig, query: str, page: int) -> str:
+        """Page de résultats : le modèle du marché, ASIN propres à la recherche et à la page"""
+        if page > config.pages:
+            return EMPTY_PAGE
+        prefix = f"{config.market}\n{query}\n{page}\n"
+        return ASIN_PATTERN.sub(
+            lambda match: 'B0' + hashlib.blake2b((prefix + match.group()).encode('utf-8'),
+                                                 digest_size=4).hexdigest().upper(),
+            config.template
+        )
+
+    def draw(self, config: MarketConfig):
+        """Tire la latence et l'éventuelle erreur simulée d'une requête"""
+        with self._lock:
+            latency = max(config.latency_ms + self.random.uniform(-config.jitter_ms, config.jitter_ms), 0)
+            roll = self.random.random()
+        status = 429 if roll < config.rate_429 else 503 if roll < config.rate_429 + config.rate_503 else 200
+        return latency / 1000, status
+
+    def record(self, market: str, status: int):
+        with self._lock:
+            self.counts[(market, status)] += 1
+
+    def stats(self) -> Dict:
+        """Requêtes servies par marché et par statut"""
+        with self._lock:
+            stats: Dict[str, Dict[str, int]] = {}
+            for (market, status), count in sorted(self.counts.items()):
+                stats.setdefault(market, {})[str(status)] = count
+            return stats
+
+    def handler(self, config: MarketConfig):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass  # Pas de journal par requête pendant les tests de charge
+
+            def send_body(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+                fake.record(config.market, status)
+
+            def do_HEAD(self):
+                self.send_body(200)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == '/__stats':
+                    self.send_body(200, json.dumps(fake.stats()).encode('utf-8'),
+                                   {'Content-Type': 'application/json'})
+                    return
+                if url.path != '/s':
+                    self.send_body(404)
+                    return
+
+                latency, status = fake.draw(config)
+                time.sleep(latency)
+                if status != 200:
+                    self.send_body(status, b'', {'Retry-After': '1'} if status == 429 else {})
+                    return
+
+                params = parse_qs(url.query)
+                query = params.get('k', [''])[0]
+                page = int(params.get('page', ['1'])[0] or 1)
+                body = fake.render(config, query, page).encode('utf-8')
+                etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_body(304, b'', {'ETag': etag})
+                    return
+
+                headers = {'Content-Type': 'text/html; charset=utf-8', 'ETag': etag}
+                if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                    body = gzip.compress(body, compresslevel=1)
+                    headers['Content-Encoding'] = 'gzip'
+                self.send_body(200, body, headers)
+
+        return Handler
+
+    def start(self):
+        """Démarre un serveur par marché, chacun dans son thread"""
+        for market, domain in self.domains().items():
+            server = ThreadingHTTPServer((self.host, int(domain.rsplit(':', 1)[1])),
+                                         self.handler(self.configs[market]))
+            server.daemon_threads = True
+            self._servers.append(server)
+            threading.Thread(target=server.serve_forever, name=f"fake-amazon-{market}", daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+
+def load_template(market: str) -> str:
+    with gzip.open(os.path.join(FIXTURES_DIR, f"{MARKET_FIXTURES[market]}.html.gz")) as file:
+        return file.read().decode('utf-8')
+
+def build_configs(defaults: Dict, overrides: Optional[Dict[str, Dict]] = None,
+                  markets: Optional[List[str]] = None) -> Dict[str, MarketConfig]:
+    """Configuration de chaque marché : valeurs par défaut, remplacées par marché"""
+    overrides = overrides or {}
+    configs = {}
+    for market in markets or AMAZON_DOMAINS:
+        values = {**defaults, **overrides.get(market, {})}
+        configs[market] = MarketConfig(market, load_template(market), **values)
+    return configs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur Amazon local pour les tests de charge")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900, help="Port du premier marché (suivants : +1, +2...)")
+    parser.add_argument('--latency-ms', type=float, default=DEFAULTS['latency_ms'])
+    parser.add_argument('--jitter-ms', type=float, default=DEFAULTS['jitter_ms'])
+    parser.add_argument('--rate-429', type=float, default=DEFAULTS['rate_429'])
+    parser.add_argument('--rate-503', type=float, default=DEFAULTS['rate_503'])
+    parser.add_argument('--pages', type=int, default=DEFAULTS['pages'], help="Pages de résultats par recherche")
+    parser.add_argument('--config', help="JSON de réglages par marché, ex. {\"fr\": {\"latency_ms\": 300}}")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as file:
+            overrides = json.load(file)
+    defaults = {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'rate_429': args.rate_429,
+                'rate_503': args.rate_503, 'pages': args.pages}
+    fake = FakeAmazon(build_configs(defaults, overrides), args.host, args.port).start()
+    print(f"SCRAPER_AMAZON_DOMAINS={fake.env_value()}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Test de charge de bout en bout : API -> scraper -> HTTP
+
+Sans --url, démarre le serveur Amazon local (fake_amazon.py) et l'API
+(uvicorn fastapi_integration:app) redirigée vers lui, caches de pages et de
+résultats désactivés et fichiers dans un répertoire temporaire. Envoie ensuite
+des POST /scrape à concurrence fixe et rapporte latences p50/p95/p99, débit,
+taux d'erreur et requêtes reçues par le faux Amazon.
+
+Usage :
+    python benchmarks/load_test.py --concurrency 16 --requests 200
+    python benchmarks/load_test.py --duration 60 --rate-429 0.05 --latency-ms 300 --json charge.json
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --concurrency 8   # API déjà lancée
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from fake_amazon import DEFAULTS, FakeAmazon, build_configs  # noqa: E402
+
+QUERIES = ['casque bluetooth', 'wireless headphones', 'kopfhörer kabellos', 'ワイヤレスイヤホン',
+           'سماعات لاسلكية', 'souris gaming', 'laptop stand', 'clavier mécanique']
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentile par rang le plus proche (valeurs triées)"""
+    if not values:
+        return 0.0
+    index = min(max(int(round(fraction * len(values) + 0.5)) - 1, 0), len(values) - 1)
+    return values[index]
+
+class LoadGenerator:
+    """Envoie des scrapings à concurrence fixe et mesure chaque réponse"""
+
+    def __init__(self, url: str, concurrency: int, num_products: int, markets: List[Optional[str]],
+                 timeout: float = 300):
+        self.url = url.rstrip('/')
+        self.concurrency = concurrency
+        self.num_products = num_products
+        self.markets = markets
+        self.timeout = timeout
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._local = threading.local()
+
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def payload(self) -> Dict:
+        """Requête suivante : recherches distinctes, pour que le cache de résultats ne réponde pas"""
+        index = next(self._counter)
+        payload = {'search_query': f"{QUERIES[index % len(QUERIES)]} {index}",
+                   'num_products': self.num_products}
+        market = self.markets[index % len(self.markets)]
+        if market:
+            payload['market'] = market
+        return payload
+
+    def send(self):
+        started = time.perf_counter()
+        try:
+            response = self.session().post(f"{self.url}/scrape", json=self.payload(), timeout=self.timeout)
+            error = None if response.status_code == 200 and response.json().get('success') else \
+                f"HTTP {response.status_code}" if response.status_code != 200 else 'success=false'
+        except requests.RequestException as e:
+            error = type(e).__name__
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.append(elapsed)
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    def run(self, total: Optional[int] = None, duration: Optional[float] = None) -> Dict:
+        """Envoie `total` requêtes, ou pendant `duration` secondes, avec `concurrency` clients"""
+        deadline = time.monotonic() + duration if duration else None
+        remaining = itertools.count()
+
+        def worker():
+            while True:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                if total is not None and next(remaining) >= total:
+                    return
+                self.send()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            for future in [executor.submit(worker) for _ in range(self.concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        failed = sum(self.errors.values())
+        return {
+            'requests': count,
+            'concurrency': self.concurrency,
+            'elapsed_seconds': round(elapsed, 2),
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0,
+            'error_rate': round(failed / count, 4) if count else 0,
+            'errors': self.errors,
+            'latency_ms': {
+                'p50': round(percentile(latencies, 0.50) * 1000, 1),
+                'p95': round(percentile(latencies, 0.95) * 1000, 1),
+                'p99': round(percentile(latencies, 0.99) * 1000, 1),
+                'max': round(latencies[-1] * 1000, 1) if latencies else 0
+            }
+        }
+
+def start_api(port: int, domains: str, workdir: str, extra_env: Dict[str, str]) -> subprocess.Popen:
+    """Lance l'API dans un sous-processus, redirigée vers le faux Amazon"""
+    env = dict(os.environ)
+    env.update({
+        'SCRAPER_AMAZON_DOMAINS': domains,
+        'SCRAPER_CACHE_TTL': '0',
+        'SCRAPER_RESULT_TTL': '0',
+        'SCRAPER_EXPORT_DIR': os.path.join(workdir, 'exports'),
+        'SCRAPER_DB_PATH': os.path.join(workdir, 'products.db'),
+        'SCRAPER_CACHE_DIR': os.path.join(workdir, 'cache'),
+        'PYTHONPATH': ROOT_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    })
+    env.update(extra_env)
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'fastapi_integration:app', '--host', '127.0.0.1',
+         '--port', str(port), '--log-level', 'warning'],
+        cwd=workdir, env=env
+    )
+
+def wait_ready(url: str, process: Optional[subprocess.Popen] = None, timeout: float = 120):
+    """Attend que /health réponde 200 (préchauffage terminé)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"L'API s'est arrêtée (code {process.returncode})")
+        try:
+            if requests.get(f"{url}/health", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("L'API n'est pas prête")
+
+def print_report(report: Dict):
+    latency = report['latency_ms']
+    print(f"\n{report['requests']} requêtes en {report['elapsed_seconds']} s "
+          f"(concurrence {report['concurrency']})")
+    print(f"Débit       : {report['throughput_rps']} req/s")
+    print(f"Latence     : p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+          f"max {latency['max']} ms")
+    print(f"Erreurs     : {report['error_rate']:.2%} {report['errors'] or ''}")
+    if report.get('upstream'):
+        print(f"Faux Amazon : {json.dumps(report['upstream'], ensure_ascii=False)}")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge de /scrape contre un Amazon local")
+    parser.add_argument('--url', help="API déjà lancée (sinon API et faux Amazon démarrés localement)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=100, help="Nombre de requêtes (ignoré avec --duration)")
+    parser.add_argument('--duration', type=float, help="Durée du test en secondes")
+    parser.add_argument('--num-products', type=int, default=50)
+    parser.add_argument('--markets', default='fr,en,de,jp,ar',
+                        help="Marchés imposés à tour de rôle ('auto' : détection)")
+    parser.add_argument('--api-port', type=int, default=8800)
+    parser.add_argument('--port', type=int, default=8900, help="Premier port du faux Amazon")
+    parser.add_argument('--latency-ms', type=float, default=DEFAULTS['latency_ms'])
+    parser.add_argument('--jitter-ms', type=float, default=DEFAULTS['jitter_ms'])
+    parser.add_argument('--rate-429', type=float, default=DEFAULTS['rate_429'])
+    parser.add_argument('--rate-503', type=float, default=DEFAULTS['rate_503'])
+    parser.add_argument('--pages', type=int, default=DEFAULTS['pages'])
+    parser.add_argument('--config', help="JSON de réglages par marché du faux Amazon")
+    parser.add_argument('--api-env', action='append', default=[],
+                        help="Variable d'environnement de l'API, ex. SCRAPER_RATE_MAX=20 (répétable)")
+    parser.add_argument('--json', help="Écrit le rapport dans ce fichier")
+    args = parser.parse_args(argv)
+
+    markets = [None if market == 'auto' else market for market in args.markets.split(',')]
+    fake = process = None
+    workdir = tempfile.TemporaryDirectory(prefix='scraper-load-')
+    url = args.url
+    try:
+        if url is None:
+            overrides = {}
+            if args.config:
+                with open(args.config, encoding='utf-8') as file:
+                    overrides = json.load(file)
+            defaults = {'latency_ms': args.latency_ms, 'jitter_ms': args.jitter_ms, 'rate_429': args.rate_429,
+                        'rate_503': args.rate_503, 'pages': args.pages}
+            fake = FakeAmazon(build_configs(defaults, overrides), port=args.port).start()
+            extra_env = dict(entry.split('=', 1) for entry in args.api_env)
+            process = start_api(args.api_port, fake.env_value(), workdir.name, extra_env)
+            url = f"http://127.0.0.1:{args.api_port}"
+        wait_ready(url, process)
+
+        generator = LoadGenerator(url, args.concurrency, args.num_products, markets)
+        report = generator.run(total=None if args.duration else args.requests, duration=args.duration)
+        if fake is not None:
+            report['upstream'] = fake.stats()
+        print_report(report)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if fake is not None:
+            fake.stop()
+        workdir.cleanup()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Génère le corpus de pages de résultats du benchmark d'analyse
+
+Les pages sont synthétiques : reconstruites à la main d'après la structure des
+pages de recherche Amazon (blocs s-search-result, sélecteurs de ROBUST_SELECTORS,
+scripts et styles volumineux autour des résultats), pas enregistrées depuis le
+site. La génération est déterministe : relancer le script reproduit les mêmes
+fichiers. Usage : python benchmarks/make_fixtures.py
+"""
+
+import gzip
+import json
+import os
+import random
+from html import escape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Mots des titres par marché
+WORDS = {
+    'fr': ['Casque', 'Bluetooth', 'sans fil', 'réduction de bruit', 'Noir', 'pliable', 'autonomie 40 h', 'micro intégré'],
+    'en': ['Wireless', 'Headphones', 'Noise Cancelling', 'Over-Ear', 'Black', 'Foldable', '40H Playtime', 'Built-in Mic'],
+    'de': ['Kopfhörer', 'Kabellos', 'Geräuschunterdrückung', 'Over-Ear', 'Schwarz', 'faltbar', '40 Std. Akku', 'Mikrofon'],
+    'uk': ['Wireless', 'Headphones', 'Noise Cancelling', 'Over-Ear', 'Black', 'Foldable', '40H Playtime', 'Built-in Mic'],
+    'jp': ['ワイヤレス', 'イヤホン', 'ノイズキャンセリング', 'ブラック', '折りたたみ', '40時間再生', 'マイク内蔵'],
+    'ar': ['سماعات', 'لاسلكية', 'عزل الضوضاء', 'أسود', 'قابلة للطي', 'بطارية 40 ساعة', 'ميكروفون'],
+    'in': ['Wireless', 'Earbuds', 'ENC', 'Bluetooth 5.3', 'Black', 'Fast Charging', '40H Playtime']
+}
+
+def format_price(market: str, value: float) -> str:
+    """Prix affiché comme sur le marché (séparateur décimal et devise)"""
+    if market in ('fr', 'de'):
+        return f"{value:.2f}".replace('.', ',') + ' €'
+    if market == 'uk':
+        return f"£{value:.2f}"
+    if market == 'jp':
+        return f"￥{int(value):,}円"
+    if market == 'ar':
+        return f"{value:.2f} ر.س"
+    if market == 'in':
+        return f"₹{int(value):,}"
+    return f"${value:.2f}"
+
+def format_rating(market: str, rating: float) -> str:
+    """Texte alternatif de l'icône d'étoiles"""
+    return {
+        'fr': f"{rating:.1f} sur 5 étoiles".replace('.', ','),
+        'de': f"{rating:.1f} von 5 Sternen".replace('.', ','),
+        'jp': f"5つ星のうち{rating:.1f}",
+        'ar': f"{rating:.1f} من 5 نجوم"
+    }.get(market, f"{rating:.1f} out of 5 stars")
+
+def title(rng: random.Random, market: str) -> str:
+    words = WORDS[market]
+    return ' '.join(rng.sample(words, k=min(len(words), rng.randint(4, 7))))
+
+def item_grid(rng, market, asin, index, sponsored=False):
+    """Bloc du layout grille (le plus courant) : titre h2, prix a-offscreen"""
+    price = rng.uniform(8, 250)
+    badge = '<span class="a-badge-text">Best Seller</span>' if index % 9 == 0 else ''
+    label = '<span class="s-label-popover-default">Sponsorisé</span>' if sponsored else ''
+    return f'''<div data-asin="{asin}" data-index="{index}" data-component-type="s-search-result" class="sg-col-4-of-24 s-result-item s-asin sg-col">
+<div class="sg-col-inner"><div class="s-widget-container"><div class="puis-card-container">
+<div class="s-product-image-container"><a class="a-link-normal s-no-outline" href="/{escape(title(rng, market).replace(' ', '-'))}/dp/{asin}/ref=sr_1_{index}?qid=1712345678&amp;sr=8-{index}"><img class="s-image" src="https://m.media-amazon.com/images/I/{asin}.jpg" alt="" srcset="https://m.media-amazon.com/images/I/{asin}._AC_UL320_.jpg 1x, https://m.media-amazon.com/images/I/{asin}._AC_UL480_.jpg 1.5x"></a></div>
+<div class="a-section a-spacing-small puis-padding-left-small">{label}{badge}
+<div data-cy="title-recipe" class="a-section"><h2 class="a-size-mini a-spacing-none a-color-base s-line-clamp-4"><a class="a-link-normal s-underline-text s-link-style a-text-normal" href="/dp/{asin}/ref=sr_1_{index}?qid=1712345678&amp;sr=8-{index}"><span class="a-size-base-plus a-color-base a-text-normal">{escape(title(rng, market))}</span></a></h2></div>
+<div data-cy="reviews-block" class="a-section"><div class="a-row a-size-small"><span><i class="a-icon a-icon-star-small a-star-small-4-5"><span class="a-icon-alt">{format_rating(market, rng.uniform(3.2, 4.9))}</span></i></span>
+<span class="a-size-base s-underline-text"><a class="a-link-normal" href="/dp/{asin}#customerReviews"><span class="a-size-base s-underline-text">{rng.randint(0, 48000):,}</span></a></span></div></div>
+<div data-cy="price-recipe" class="a-section"><a class="a-link-normal s-no-hover" href="/dp/{asin}"><span class="a-price" data-a-size="xl" data-a-color="base"><span class="a-offscreen">{format_price(market, price)}</span><span aria-hidden="true"><span class="a-price-whole">{int(price)}</span><span class="a-price-fraction">{int(price * 100) % 100:02d}</span></span></span></a></div>
+<div class="a-row a-size-base a-color-secondary s-align-children-center"><span>Livraison GRATUIT</span></div>
+</div></div></div></div></div>'''
+
+def item_list(rng, market, asin, index, sponsored=False):
+    """Bloc du layout liste : titre a-size-medium, prix entier seulement, sans data-cy"""
+    price = rng.uniform(5, 400)
+    return f'''<div data-asin="{asin}" data-index="{index}" data-component-type="s-search-result" class="s-result-item s-asin sg-col-0-of-12 sg-col-16-of-20 sg-col sg-col-12-of-16">
+<div class="sg-col-inner"><div class="a-section a-spacing-medium"><div class="sg-row">
+<div class="sg-col-4-of-12 sg-col-4-of-16 sg-col"><div class="sg-col-inner"><img class="s-image" src="https://m.media-amazon.com/images/I/{asin}.jpg" alt=""></div></div>
+<div class="sg-col-12-of-16 sg-col"><div class="sg-col-inner">
+<div class="a-section a-spacing-none"><h2 class="a-size-mini a-spacing-none a-color-base s-line-clamp-2"><a class="a-link-normal a-text-normal" href="/gp/product/{asin}?qid=1712345678"><span class="a-size-medium a-color-base a-text-normal">{escape(title(rng, market))}</span></a></h2></div>
+<div class="a-section a-spacing-none a-spacing-top-micro"><div class="a-row a-size-small"><span><span class="a-icon-alt">{format_rating(market, rng.uniform(3.0, 5.0))}</span></span>
+<span><a class="a-link-normal" href="/dp/{asin}#customerReviews"><span class="a-size-base">{rng.randint(0, 9000):,}</span></a></span></div></div>
+<div class="a-row"><span class="a-price"><span class="a-price-whole">{int(price)}</span><span class="a-price-fraction">99</span></span></div>
+</div></div></div></div></div></div>'''
+
+def item_legacy(rng, market, asin, index, sponsored=False):
+    """Ancien layout sans data-component-type : l'analyse restreinte ne le reconnaît pas"""
+    price = rng.uniform(5, 150)
+    return f'''<li data-asin="{asin}" class="s-result-item celwidget">
+<div class="s-item-container"><div class="a-row a-spacing-mini"><a class="a-link-normal s-access-detail-page" href="https://www.amazon.co.uk/dp/{asin}"><h2 class="a-size-medium s-inline a-text-normal">{escape(title(rng, market))}</h2></a></div>
+<div class="a-row"><span class="a-size-base a-color-price s-price">{format_price(market, price)}</span><span class="a-price"><span class="a-offscreen">{format_price(market, price)}</span></span></div>
+<div class="a-row a-spacing-none"><i class="a-icon a-icon-star"><span class="a-icon-alt">{format_rating(market, rng.uniform(3.0, 5.0))}</span></i>
+<a class="a-size-small a-link-normal" href="/dp/{asin}#customerReviews">{rng.randint(0, 3000)}</a></div></div></li>'''
+
+def item_range(rng, market, asin, index, sponsored=False):
+    """Bloc avec fourchette de prix (variantes), badge supplémentaire"""
+    low = rng.uniform(500, 3000)
+    badge = '<span class="a-badge-supplementary-text">Amazon\'s Choice</span>' if index % 5 == 0 else ''
+    return f'''<div data-asin="{asin}" data-component-type="s-search-result" class="s-result-item s-asin sg-col-4-of-20 sg-col">
+<div class="sg-col-inner"><div class="a-section">{badge}
+<div class="a-section"><h2 class="a-size-mini"><a class="a-link-normal" href="/dp/{asin}?qid=1712345678"><span class="a-size-base-plus a-color-base a-text-normal">{escape(title(rng, market))}</span></a></h2></div>
+<div class="a-row a-size-small"><span class="a-icon-alt">{format_rating(market, rng.uniform(3.0, 4.8))}</span><span class="a-size-base a-color-secondary">({rng.randint(10, 90000):,})</span></div>
+<div class="a-row"><span class="a-price-range"><span class="a-price-range-min"><span class="a-offscreen">{format_price(market, low)}</span></span> - <span class="a-price"><span class="a-offscreen">{format_price(market, low * 1.6)}</span></span></span></div>
+</div></div></div>'''
+
+# Fragments de JavaScript minifié pour les scripts de remplissage
+JS_TOKENS = ['function(a,b){', 'return ', 'var e=', 'this.', 'a.push(b);', '}', 'if(!c)', 'P.when(', '"A")',
+             '.execute(', 'ue.count(', '"s-', 'window.', 'document.', 'getElementById(', 'null', ';', ',']
+
+def filler(rng: random.Random, kilobytes: int) -> str:
+    """Scripts et styles en ligne comparables à ceux des vraies pages"""
+    chunks = []
+    for index in range(kilobytes // 8):
+        payload = ''.join(rng.choice(JS_TOKENS) for _ in range(1100))
+        chunks.append(f'<script type="text/javascript">P.when("A").execute("s{index}",function(){{var d="{payload}";}});</script>')
+    chunks.append('<style>' + ' '.join(f'.s-x{index}{{margin:{index % 7}px}}' for index in range(400)) + '</style>')
+    return '\n'.join(chunks)
+
+def page(rng, market, items_html, kilobytes, lang):
+    direction = ' dir="rtl"' if market == 'ar' else ''
+    return f'''<!doctype html><html lang="{lang}"{direction}><head><meta charset="utf-8"><title>Amazon</title>
+{filler(rng, kilobytes)}</head><body>
+<header id="navbar"><div id="nav-belt"><a href="/" class="nav-logo-link">Amazon</a><form id="nav-search-bar-form"><input type="text" id="twotabsearchtextbox"></form></div>
+<div id="nav-main">{''.join(f'<a class="nav-a" href="/b?node={index}">Rayon {index}</a>' for index in range(60))}</div></header>
+<div id="search"><div class="s-desktop-width-max s-desktop-content sg-row">
+<div class="sg-col-4-of-24 sg-col"><div id="s-refinements">{''.join(f'<div class="a-section"><span class="a-size-base">Filtre {index}</span></div>' for index in range(80))}</div></div>
+<div class="sg-col-20-of-24 sg-col"><div class="sg-col-inner"><span data-component-type="s-search-results"><div class="s-main-slot s-result-list s-search-results sg-row">
+{items_html}
+</div></span></div></div></div></div>
+<div id="navFooter">{''.join(f'<a href="/help/{index}">Aide {index}</a>' for index in range(120))}</div>
+{filler(rng, kilobytes // 4)}
+</body></html>'''
+
+# (nom, marché, domaine, layout, nombre de blocs, doublons sponsorisés, Ko de scripts)
+FIXTURES = [
+    ('fr_grid', 'fr', 'https://www.amazon.fr', item_grid, 48, 0, 320),
+    ('fr_sponsored', 'fr', 'https://www.amazon.fr', item_grid, 60, 8, 320),
+    ('en_list', 'en', 'https://www.amazon.com', item_list, 22, 0, 400),
+    ('de_grid', 'de', 'https://www.amazon.de', item_grid, 48, 0, 320),
+    ('uk_legacy', 'uk', 'https://www.amazon.co.uk', item_legacy, 24, 0, 160),
+    ('jp_grid', 'jp', 'https://www.amazon.co.jp', item_grid, 48, 0, 320),
+    ('ar_grid', 'ar', 'https://www.amazon.sa', item_grid, 24, 0, 240),
+    ('in_range', 'in', 'https://www.amazon.in', item_range, 24, 0, 240)
+]
+
+LANGS = {'fr': 'fr-FR', 'en': 'en-US', 'de': 'de-DE', 'uk': 'en-GB', 'jp': 'ja-JP', 'ar': 'ar-AE', 'in': 'en-IN'}
+
+def build(name, market, base_domain, layout, count, duplicates, kilobytes):
+    rng = random.Random(name)
+    asins = [f"B0{rng.randrange(16 ** 8):08X}" for _ in range(count - duplicates)]
+    # Les doublons reprennent des ASIN de la page (sponsorisés répétés plus bas)
+    order = asins + rng.sample(asins, duplicates)
+    items = '\n'.join(layout(rng, market, asin, index, sponsored=index >= count - duplicates)
+                      for index, asin in enumerate(order))
+    if layout is item_legacy:
+        items = f'<ul id="s-results-list-atf">{items}</ul>'
+    html = page(rng, market, items, kilobytes, LANGS[market])
+    path = os.path.join(FIXTURES_DIR, f'{name}.html.gz')
+    with open(path, 'wb') as file:
+        # mtime fixe : fichier identique à chaque génération
+        with gzip.GzipFile(fileobj=file, mode='wb', compresslevel=9, mtime=0) as archive:
+            archive.write(html.encode('utf-8'))
+    return {'name': name, 'market': market, 'base_domain': base_domain,
+            'file': os.path.basename(path), 'items': count, 'unique_asins': len(asins)}
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    manifest = [build(*fixture) for fixture in FIXTURES]
+    with open(os.path.join(FIXTURES_DIR, 'manifest.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+        file.write('\n')
+    for entry in manifest:
+        print(f"{entry['file']}: {entry['items']} blocs, {entry['unique_asins']} ASIN uniques")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Répertoire géré des fichiers d'export servis par /download
+Taille et âge plafonnés (éviction des plus anciens), empreinte SHA-256 du contenu
+pour les ETag, lecture par plages et compression gzip à la volée
+"""
+
+import hashlib
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+# Configuration par variables d'environnement
+EXPORT_DIR = os.environ.get('SCRAPER_EXPORT_DIR', 'exports')
+EXPORT_MAX_MB = int(os.environ.get('SCRAPER_EXPORT_MAX_MB', '500'))
+EXPORT_MAX_AGE = int(os.environ.get('SCRAPER_EXPORT_MAX_AGE', str(7 * 24 * 3600)))
+EXPORT_GZIP = os.environ.get('SCRAPER_EXPORT_GZIP', '1') != '0'
+
+CHUNK_SIZE = 64 * 1024
+
+# Formats déjà compressés : pas de gzip à la volée
+COMPRESSED_EXTENSIONS = ('.gz', '.parquet')
+
+class ExportStore:
+    """Fichiers d'export d'un répertoire, avec empreintes mémorisées et éviction"""
+
+    def __init__(self, directory: str = EXPORT_DIR, max_bytes: int = EXPORT_MAX_MB * 1024 * 1024,
+                 max_age: int = EXPORT_MAX_AGE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}  # nom -> (taille, mtime_ns, sha256)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def path_for(self, filename: str) -> str:
+        """Chemin d'un nouveau fichier d'export (le répertoire est créé au besoin)"""
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, filename)
+
+    def resolve(self, filename: str) -> Optional[str]:
+        """
+        Chemin d'un export existant, None si le nom sort du répertoire
+        (séparateurs, '..', fichiers cachés) ou si le fichier n'existe pas
+        """
+        if not filename or filename != os.path.basename(filename) or filename.startswith('.'):
+            return None
+        if os.sep != '/' and '/' in filename:
+            return None
+        directory = os.path.realpath(self.directory)
+        path = os.path.realpath(os.path.join(directory, filename))
+        if os.path.dirname(path) != directory or not os.path.isfile(path):
+            return None
+        return path
+
+    def content_hash(self, path: str) -> str:
+        """Empreinte SHA-256 du fichier, recalculée seulement s'il a changé"""
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        with self._lock:
+            entry = self._hashes.get(name)
+        if entry is not None and entry[:2] == (stat.st_size, stat.st_mtime_ns):
+            return entry[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        value = digest.hexdigest()
+        with self._lock:
+            self._hashes[name] = (stat.st_size, stat.st_mtime_ns, value)
+        return value
+
+    def etag(self, path: str) -> str:
+        """ETag fort dérivé du contenu"""
+        return f'"{self.content_hash(path)[:32]}"'
+
+    def add(self, path: str):
+        """Enregistre un export terminé (empreinte calculée tant qu'il est en cache disque), puis évince"""
+        self.content_hash(path)
+        self.evict(keep=os.path.basename(path))
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.is_file() and not entry.name.startswith('.')]
+        except FileNotFoundError:
+            return []
+
+    def evict(self, keep: Optional[str] = None):
+        """Supprime les exports trop anciens, puis les plus anciens jusqu'à 90 % du plafond"""
+        now = time.time()
+        entries = sorted(((entry, entry.stat()) for entry in self._entries()),
+                         key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        over_limit = total > self.max_bytes
+        target = self.max_bytes * 0.9
+
+        for entry, stat in entries:
+            expired = now - stat.st_mtime > self.max_age
+            if not expired and not (over_limit and total > target):
+                break
+            if entry.name == keep:
+                continue
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= stat.st_size
+            with self._lock:
+                self._hashes.pop(entry.name, None)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Statistiques du répertoire d'export"""
+        entries = self._entries()
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'files': len(entries),
+                'size_bytes': sum(entry.stat().st_size for entry in entries),
+                'max_bytes': self.max_bytes,
+                'max_age': self.max_age,
+                'evictions': self.evictions
+            }
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Vrai si l'en-tête If-None-Match désigne l'ETag (comparaison faible, '*' accepté)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Plage unique 'bytes=début-fin' ou 'bytes=-suffixe' en (début, fin incluse)
+
+    Returns:
+        None si l'en-tête est absent, multiple ou mal formé (réponse complète) ;
+        lève ValueError si la plage est hors du fichier (416)
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    start_text, separator, end_text = range_header[len('bytes='):].strip().partition('-')
+    if not separator or not all(text == '' or text.isdigit() for text in (start_text, end_text)):
+        return None
+
+    if not start_text:
+        if not end_text:
+            return None
+        length = int(end_text)
+        if length == 0 or size == 0:
+            raise ValueError("Plage hors du fichier")
+        return max(size - length, 0), size - 1
+
+    start = int(start_text)
+    # Avant le contrôle de l'ordre : 'bytes=100-' sur 50 octets donnerait fin < début
+    if start >= size:
+        raise ValueError("Plage hors du fichier")
+    end = int(end_text) if end_text else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+def iter_file(path: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Lit un fichier par blocs, de start à end inclus"""
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = (end - start + 1) if end is not None else None
+        while remaining is None or remaining > 0:
+            chunk = file.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+def iter_gzip(path: str) -> Iterator[bytes]:
+    """Compresse un fichier en gzip à la volée, bloc par bloc"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in iter_file(path):
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def compressible(path: str) -> bool:
+    """Vrai si le fichier peut être compressé à la volée (option activée, format non compressé)"""
+    return EXPORT_GZIP and not path.endswith(COMPRESSED_EXTENSIONS)
+
+def accepts_gzip(path: str, accept_encoding: Optional[str]) -> bool:
+    """Compression à la volée si le fichier s'y prête et que le client l'accepte"""
+    return compressible(path) and 'gzip' in (accept_encoding or '').lower()
+
+_default_store: Optional[ExportStore] = None
+_default_store_lock = threading.Lock()
+
+def get_export_store() -> ExportStore:
+    """Retourne le répertoire d'export partagé du processus"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ExportStore()
+    return _default_store
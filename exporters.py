@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Export des produits scrapés : CSV, CSV gzip, NDJSON, Parquet et Arrow
+Chaque exporteur écrit page par page, au fil du scraping, sans attendre
+la fin ni garder tous les produits en mémoire
+"""
+
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Type
+
+from export_store import get_export_store
+from product_record import CSV_FIELDNAMES, Product
+
+# Formats colonnes (optionnel : pip install pyarrow), importé au premier export
+# Parquet / Arrow plutôt qu'au démarrage (~0,1 s)
+ARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+DEFAULT_FORMAT = 'csv'
+
+def export_filename(search_query: str, extension: str) -> str:
+    """
+    Nom du fichier d'export : recherche nettoyée, horodatage et suffixe aléatoire
+    (deux scrapings de la même recherche dans la même seconde ne partagent pas le fichier)
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    safe_query = re.sub(r'[^\w\s-]', '', search_query).replace(' ', '_')
+    return f"{safe_query}_winning_products_{timestamp}_{uuid.uuid4().hex[:8]}{extension}"
+
+class Exporter:
+    """Écrit des pages de produits dans un fichier ; close() termine le fichier"""
+
+    extension = ''
+    media_type = 'application/octet-stream'
+    available = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.closed = False
+
+    @property
+    def filename(self) -> str:
+        """Nom du fichier, tel que servi par /download"""
+        return os.path.basename(self.path)
+
+    def write_page(self, products: Iterable[Product]):
+        """Ajoute les produits d'une page à la fin du fichier"""
+        products = list(products)
+        if products:
+            self._write(products)
+            self.count += len(products)
+
+    def _write(self, products: List[Product]):
+        raise NotImplementedError
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._close()
+
+    def _close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class CsvExporter(Exporter):
+    """CSV historique (mêmes colonnes), vidé sur disque après chaque page"""
+
+    extension = '.csv'
+    media_type = 'text/csv'
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = self._open(path)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(CSV_FIELDNAMES)
+
+    def _open(self, path: str):
+        return open(path, mode='w', newline='', encoding='utf-8')
+
+    def _write(self, products: List[Product]):
+        self._writer.writerows(product.to_row() for product in products)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+class GzipCsvExporter(CsvExporter):
+    """CSV compressé gzip"""
+
+    extension = '.csv.gz'
+    media_type = 'application/gzip'
+
+    def _open(self, path: str):
+        return gzip.open(path, mode='wt', newline='', encoding='utf-8', compresslevel=6)
+
+class NdjsonExporter(Exporter):
+    """Un objet JSON par ligne, au format dict historique"""
+
+    extension = '.ndjson'
+    media_type = 'application/x-ndjson'
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, mode='w', encoding='utf-8')
+
+    def _write(self, products: List[Product]):
+        self._file.writelines(json.dumps(product.to_dict(), ensure_ascii=False) + '\n' for product in products)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+def arrow_schema():
+    """Schéma colonnes des produits (devise et badge en dictionnaire)"""
+    import pyarrow as pa
+    return pa.schema([
+        ('SKU', pa.string()),
+        ('Nom', pa.string()),
+        ('Prix', pa.float64()),
+        ('Devise', pa.dictionary(pa.int32(), pa.string())),
+        ('Lien', pa.string()),
+        ('Rating', pa.float64()),
+        ('Review_Count', pa.int64()),
+        ('Badge', pa.dictionary(pa.int32(), pa.string())),
+        ('Winning_Score', pa.float64()),
+        ('Date_Scraping', pa.string())
+    ])
+
+def arrow_batch(products: List[Product], schema):
+    """Convertit une page de produits en RecordBatch Arrow"""
+    import pyarrow as pa
+    columns = list(zip(*(product.to_row() for product in products)))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema
+    )
+
+class ArrowExporter(Exporter):
+    """Fichier Arrow IPC (Feather v2), un RecordBatch par page"""
+
+    extension = '.arrow'
+    media_type = 'application/vnd.apache.arrow.file'
+    available = ARROW_AVAILABLE
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+        super().__init__(path)
+        self._schema = arrow_schema()
+        self._writer = pa.ipc.new_file(path, self._schema)
+
+    def _write(self, products: List[Product]):
+        self._writer.write_batch(arrow_batch(products, self._schema))
+
+    def _close(self):
+        self._writer.close()
+
+class ParquetExporter(Exporter):
+    """
+    Parquet compressé (zstd) ; les pages sont regroupées en row groups de
+    `row_group_size` produits pour garder des colonnes efficaces à la lecture
+    """
+
+    extension = '.parquet'
+    media_type = 'application/vnd.apache.parquet'
+    available = ARROW_AVAILABLE
+
+    def __init__(self, path: str, row_group_size: int = 10000):
+        import pyarrow.parquet as pq
+        super().__init__(path)
+        self.row_group_size = row_group_size
+        self._schema = arrow_schema()
+        self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+        self._pending: List = []
+        self._pending_rows = 0
+
+    def _write(self, products: List[Product]):
+        self._pending.append(arrow_batch(products, self._schema))
+        self._pending_rows += len(products)
+        if self._pending_rows >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+        if self._pending:
+            self._writer.write_table(pa.Table.from_batches(self._pending, schema=self._schema))
+            self._pending = []
+            self._pending_rows = 0
+
+    def _close(self):
+        self._flush()
+        self._writer.close()
+
+EXPORTERS: Dict[str, Type[Exporter]] = {
+    'csv': CsvExporter,
+    'csv.gz': GzipCsvExporter,
+    'ndjson': NdjsonExporter,
+    'parquet': ParquetExporter,
+    'arrow': ArrowExporter
+}
+
+def available_formats() -> List[str]:
+    """Formats utilisables avec les dépendances installées"""
+    return [name for name, exporter in EXPORTERS.items() if exporter.available]
+
+def get_exporter_class(export_format: Optional[str]) -> Type[Exporter]:
+    """Classe d'exporteur d'un format, ValueError si inconnu ou indisponible"""
+    exporter = EXPORTERS.get((export_format or DEFAULT_FORMAT).lower())
+    if exporter is None:
+        raise ValueError(f"Format d'export inconnu: {export_format}")
+    if not exporter.available:
+        raise ValueError(f"Format d'export indisponible (pyarrow non installé): {export_format}")
+    return exporter
+
+def media_type_for(filename: str) -> str:
+    """Type MIME d'un fichier d'export d'après son extension"""
+    for exporter in sorted(EXPORTERS.values(), key=lambda exporter: -len(exporter.extension)):
+        if filename.endswith(exporter.extension):
+            return exporter.media_type
+    return 'application/octet-stream'
+
+def create_exporter(search_query: str, export_format: Optional[str] = None) -> Exporter:
+    """Ouvre un exporteur pour une recherche, dans le répertoire d'export géré"""
+    exporter = get_exporter_class(export_format)
+    return exporter(get_export_store().path_for(export_filename(search_query, exporter.extension)))
@@ -3,19 +3,55 @@
 Exemple d'intégration FastAPI pour le scraping Amazon
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+import time
+
+# Début du démarrage (imports compris), référence du temps jusqu'à la première requête
+STARTED_AT = time.monotonic()
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.routing import Match
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List
+import json
 import os
 from datetime import datetime
 
+from exporters import DEFAULT_FORMAT, available_formats, create_exporter, get_exporter_class, media_type_for
+from export_store import accepts_gzip, compressible, etag_matches, get_export_store, iter_file, iter_gzip, parse_range
+from jobs import JobManager
+from metrics import (
+    CONTENT_TYPE_LATEST, PROMETHEUS_AVAILABLE, REQUEST_SECONDS, REQUESTS_IN_PROGRESS, SCRAPES_IN_PROGRESS,
+    render_metrics
+)
+from product_store import ORDERS, get_product_store
+from profiling import PROFILING_ENABLED, get_profile_store, profile_call
+from result_cache import ResultCache, make_result_key
+from tracing import shutdown_tracing
+
 # Import du script de scraping amélioré
 try:
-    from scrape_products_enhanced import scrape_products_api
+    from scrape_products_enhanced import (
+        SUPPORTED_MARKETS, scrape_products_api, scrape_products_api_async, warm_up_scraper, selector_plan_stats,
+        start_parse_pool, shutdown_parse_pool, iter_product_pages, resolve_lang_code, finalize_results,
+        save_page, SeenAsins
+    )
+    from batch_scheduler import scrape_batch
+    from incremental_refresh import refresh_products
+    from http_client import configured_warmup_markets
+    from market_resolver import market_resolver_stats
+    from rate_limiter import rate_limiter_stats
+    from response_cache import get_response_cache
 except ImportError:
     # Fallback si le fichier n'existe pas
-    def scrape_products_api(search_query: str, num_products: int = 50, delay: int = 2) -> Dict:
+    SUPPORTED_MARKETS = ()
+
+    def scrape_products_api(search_query: str, num_products: int = 50, delay: int = 2,
+                            market: Optional[str] = None, progress_callback=None,
+                            export_format: Optional[str] = None) -> Dict:
         return {
             'products': [],
             'stats': {},
@@ -23,16 +59,167 @@ except ImportError:
             'error': 'Module de scraping non disponible'
         }
 
+    async def scrape_products_api_async(search_query: str, num_products: int = 50, delay: int = 2,
+                                        market: Optional[str] = None,
+                                        export_format: Optional[str] = None) -> Dict:
+        return scrape_products_api(search_query, num_products, delay, market)
+
+    def warm_up_scraper(lang_codes=()) -> Dict:
+        return {}
+
+    def configured_warmup_markets() -> list:
+        return []
+
+    def selector_plan_stats() -> Dict:
+        return {}
+
+    def start_parse_pool(workers=None):
+        return None
+
+    def shutdown_parse_pool(wait: bool = False):
+        pass
+
+    def iter_product_pages(search_query: str, num_products: int = 50, delay: int = 2, **kwargs):
+        return iter(())
+
+    def resolve_lang_code(search_query: str, market: Optional[str] = None, verbose: bool = False) -> str:
+        return market or 'en'
+
+    def finalize_results(products, search_query, lang_code, verbose=True, return_stats=True,
+                         exporter=None, duplicates=0, pages=0) -> Dict:
+        return scrape_products_api(search_query)
+
+    def save_page(exporter, products, search_query, lang_code):
+        exporter.write_page(products)
+
+    class SeenAsins:
+        asins = frozenset()
+        duplicates = 0
+        pages = 0
+
+    def scrape_batch(queries, markets=None, num_products: int = 50, delay: float = 2,
+                     export_format: Optional[str] = None) -> list:
+        return [scrape_products_api(search_query) for search_query in queries]
+
+    def refresh_products(search_query: str, num_products: int = 50, market: Optional[str] = None,
+                         verbose: bool = False, progress_callback=None) -> Dict:
+        return {'changes': [], 'stats': {}, 'success': False, 'error': 'Module de scraping non disponible'}
+
+    get_response_cache = None
+
+    def rate_limiter_stats() -> Dict:
+        return {}
+
+    def market_resolver_stats() -> Dict:
+        return {}
+
+# Mesures du démarrage : imports, préchauffage, première requête servie
+startup = {
+    'ready': False,
+    'import_seconds': round(time.monotonic() - STARTED_AT, 4),
+    'warm_up_seconds': None,
+    'warm_up_steps': {},
+    'warm_up_error': None,
+    'time_to_first_request': None
+}
+
+def warm_up_api():
+    """Préchauffe le scraper (profils de langue, sélecteurs, connexions) et le pool d'analyse"""
+    started = time.monotonic()
+    try:
+        steps = warm_up_scraper(configured_warmup_markets())
+        parse_started = time.perf_counter()
+        start_parse_pool()
+        steps['parse_pool'] = round(time.perf_counter() - parse_started, 4)
+        startup['warm_up_steps'] = steps
+    except Exception as e:
+        # Un préchauffage raté ne doit pas empêcher de servir : le coût sera payé plus tard
+        startup['warm_up_error'] = str(e)
+    startup['warm_up_seconds'] = round(time.monotonic() - started, 4)
+    startup['ready'] = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Le préchauffage tourne en arrière-plan : le serveur écoute tout de suite,
+    mais /health répond 503 tant qu'il n'est pas terminé
+    """
+    warm_up = asyncio.ensure_future(run_in_threadpool(warm_up_api))
+    yield
+    await warm_up
+    job_manager.shutdown()
+    # Workers attendus : sinon ils survivent à l'arrêt du serveur
+    shutdown_parse_pool(wait=True)
+    shutdown_tracing()
+
+class FirstRequestTimer:
+    """Middleware ASGI qui mesure le temps entre le démarrage et la première requête servie"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        await self.app(scope, receive, send)
+        if (startup['time_to_first_request'] is None and scope['type'] == 'http'
+                and scope['path'] != '/health'):
+            startup['time_to_first_request'] = round(time.monotonic() - STARTED_AT, 4)
+
+def route_template(scope) -> str:
+    """Gabarit de la route servie (/jobs/{job_id}), pour borner les labels des métriques"""
+    route = scope.get('route')
+    if route is None:
+        # Starlette ancien : la route n'est pas dans le scope, on la retrouve
+        for candidate in scope['app'].router.routes:
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, 'path', 'unmatched')
+
+class RequestMetrics:
+    """Middleware ASGI qui mesure la durée de chaque requête HTTP (histogramme par route et statut)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            # Durée jusqu'à la fin de la réponse, flux compris
+            REQUEST_SECONDS.labels(scope['method'], route_template(scope), str(status)).observe(
+                time.perf_counter() - started)
+
 app = FastAPI(
     title="Amazon Product Scraper API",
     description="API pour scraper les produits Amazon avec calcul de score gagnant",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
+app.add_middleware(FirstRequestTimer)
+app.add_middleware(RequestMetrics)
 
 class ScrapingRequest(BaseModel):
     search_query: str = Field(..., description="Terme de recherche (français, anglais, arabe...)")
     num_products: int = Field(default=50, ge=1, le=100, description="Nombre de produits à récupérer (1-100)")
-    delay: int = Field(default=2, ge=1, le=10, description="Délai entre les requêtes en secondes (1-10)")
+    delay: int = Field(default=2, ge=1, le=10, description="Conservé pour compatibilité : le rythme des requêtes est adapté automatiquement par domaine")
+    market: Optional[str] = Field(default=None, description="Marché Amazon (fr, en, de...), détecté automatiquement si absent")
+    export_format: str = Field(default=DEFAULT_FORMAT, description="Format du fichier généré : csv, csv.gz, ndjson, parquet ou arrow")
+    debug: bool = Field(default=False, description="POST /scrape : profiler ce scraping (rapport sur /profiles/{id}), comme l'en-tête X-Scraper-Profile: 1")
 
 class ScrapingResponse(BaseModel):
     success: bool
@@ -44,6 +231,96 @@ class ScrapingResponse(BaseModel):
     top_product: Optional[Dict] = None
     stats: Optional[Dict] = None
     error: Optional[str] = None
+    profile: Optional[Dict] = None
+
+class RefreshResponse(BaseModel):
+    success: bool
+    search_query: str
+    lang_code: str
+    changes: List[Dict]
+    stats: Dict
+    error: Optional[str] = None
+
+class BatchScrapingRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=500, description="Termes de recherche (1-500)")
+    markets: Optional[List[Optional[str]]] = Field(default=None, description="Marché par requête (même ordre que queries), détection automatique si absent")
+    num_products: int = Field(default=50, ge=1, le=100, description="Nombre de produits par requête (1-100)")
+    delay: int = Field(default=2, ge=1, le=10, description="Conservé pour compatibilité : le rythme des requêtes est adapté automatiquement par domaine")
+    export_format: str = Field(default=DEFAULT_FORMAT, description="Format des fichiers générés : csv, csv.gz, ndjson, parquet ou arrow")
+
+class BatchScrapingResponse(BaseModel):
+    total_queries: int
+    successful_queries: int
+    elapsed_seconds: float
+    results: List[ScrapingResponse]
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    progress: Dict
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[ScrapingResponse] = None
+    products: Optional[List[Dict]] = None
+    error: Optional[str] = None
+
+def build_scraping_response(search_query: str, result: Dict) -> ScrapingResponse:
+    """Construit la réponse API à partir du résultat du scraper"""
+    if not result['success']:
+        return ScrapingResponse(
+            success=False,
+            total_products=0,
+            search_query=search_query,
+            lang_code="unknown",
+            scraping_date=datetime.now().isoformat(),
+            error=result.get('error', "Aucun produit trouvé")
+        )
+
+    stats = result.get('stats', {})
+
+    return ScrapingResponse(
+        success=True,
+        total_products=stats.get('total_products', 0),
+        search_query=search_query,
+        lang_code=stats.get('lang_code', 'unknown'),
+        scraping_date=stats.get('scraping_date', datetime.now().isoformat()),
+        filename=stats.get('filename'),
+        top_product=stats.get('top_product'),
+        stats=stats
+    )
+
+def validate_market(market: Optional[str]):
+    """Rejette les marchés non supportés (400)"""
+    if market and market.lower() not in SUPPORTED_MARKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Marché inconnu: {market}"
+        )
+
+def validate_export_format(export_format: str):
+    """Rejette les formats d'export inconnus ou indisponibles (400)"""
+    try:
+        get_exporter_class(export_format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+
+# Résultats récents partagés entre requêtes identiques (SCRAPER_RESULT_TTL secondes)
+result_cache = ResultCache()
+
+def run_scrape_job(search_query: str, num_products: int, delay: int, market: Optional[str],
+                   export_format: str = DEFAULT_FORMAT, progress_callback=None) -> Dict:
+    """Scraping exécuté par un worker de jobs, partagé ensuite avec le cache de résultats"""
+    result = scrape_products_api(search_query, num_products, delay, market=market,
+                                 progress_callback=progress_callback, export_format=export_format)
+    result_cache.put(make_result_key(search_query, num_products, market, export_format), result)
+    return result
+
+# Pool borné de workers pour les jobs (SCRAPER_JOB_WORKERS)
+job_manager = JobManager(run_scrape_job)
 
 @app.get("/")
 async def root():
@@ -53,59 +330,66 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/scrape": "POST - Scraper des produits Amazon",
+            "/scrape/stream": "POST - Scraper en flux (NDJSON ou SSE)",
+            "/scrape/batch": "POST - Scraper une liste de requêtes",
+            "/scrape/refresh": "POST - Rafraîchir une recherche suivie (différences uniquement)",
+            "/jobs": "POST - Soumettre un scraping en tâche de fond",
+            "/jobs/{job_id}": "GET - Progression et résultat d'un job",
+            "/products/top": "GET - Meilleurs produits enregistrés (par recherche, marché, période)",
             "/health": "GET - Vérifier l'état de l'API",
+            "/profiles/{profile_id}": "GET - Rapport d'un scraping profilé (JSON, ou format=folded)",
+            "/metrics": "GET - Métriques Prometheus (durées par étape, sélecteurs, requêtes)",
             "/docs": "GET - Documentation interactive"
         }
     }
 
 @app.get("/health")
-async def health_check():
-    """Vérifier l'état de l'API"""
+async def health_check(response: Response):
+    """Vérifier l'état de l'API (503 tant que le préchauffage n'est pas terminé)"""
+    if not startup['ready']:
+        response.status_code = 503
     return {
-        "status": "healthy",
+        "status": "healthy" if startup['ready'] else "starting",
         "timestamp": datetime.now().isoformat(),
-        "service": "Amazon Product Scraper"
+        "service": "Amazon Product Scraper",
+        "startup": startup
     }
 
 @app.post("/scrape", response_model=ScrapingResponse)
-async def scrape_products_endpoint(request: ScrapingRequest):
+async def scrape_products_endpoint(request: ScrapingRequest,
+                                   x_scraper_profile: Optional[str] = Header(default=None)):
     """
     Scraper des produits Amazon
     
     - **search_query**: Terme de recherche (détection automatique de langue)
     - **num_products**: Nombre de produits à récupérer (1-100)
-    - **delay**: Délai entre les requêtes en secondes (1-10)
+    - **delay**: Conservé pour compatibilité (rythme adaptatif par domaine)
+    - **market**: Marché Amazon imposé (optionnel)
+    - **export_format**: Format du fichier généré (csv, csv.gz, ndjson, parquet, arrow)
+    - **debug**: Profiler ce scraping (ou en-tête `X-Scraper-Profile: 1`)
+
+    Les requêtes identiques récentes sont servies par le cache, et les requêtes
+    identiques simultanées attendent un seul et même scraping.
     """
+    validate_market(request.market)
+    validate_export_format(request.export_format)
+
+    if request.debug or (x_scraper_profile or '').lower() in ('1', 'true', 'yes'):
+        return await profile_scraping(request)
+
     try:
-        # Appel de la fonction de scraping
-        result = scrape_products_api(
+        # Appel de la fonction de scraping (pages téléchargées en parallèle)
+        key = make_result_key(request.search_query, request.num_products, request.market,
+                              request.export_format)
+        result = await result_cache.get_or_create(key, lambda: scrape_products_api_async(
             search_query=request.search_query,
             num_products=request.num_products,
-            delay=request.delay
-        )
+            delay=request.delay,
+            market=request.market,
+            export_format=request.export_format
+        ))
         
-        if not result['success']:
-            return ScrapingResponse(
-                success=False,
-                total_products=0,
-                search_query=request.search_query,
-                lang_code="unknown",
-                scraping_date=datetime.now().isoformat(),
-                error="Aucun produit trouvé"
-            )
-        
-        stats = result.get('stats', {})
-        
-        return ScrapingResponse(
-            success=True,
-            total_products=stats.get('total_products', 0),
-            search_query=request.search_query,
-            lang_code=stats.get('lang_code', 'unknown'),
-            scraping_date=stats.get('scraping_date', datetime.now().isoformat()),
-            filename=stats.get('filename'),
-            top_product=stats.get('top_product'),
-            stats=stats
-        )
+        return build_scraping_response(request.search_query, result)
         
     except Exception as e:
         raise HTTPException(
@@ -113,27 +397,366 @@ async def scrape_products_endpoint(request: ScrapingRequest):
             detail=f"Erreur lors du scraping: {str(e)}"
         )
 
+async def profile_scraping(request: ScrapingRequest) -> ScrapingResponse:
+    """
+    Scraping profilé : hors cache de résultats, exécuté par scrape_products dans un
+    thread sous l'échantillonneur ; la réponse indique où télécharger le rapport
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=403,
+            detail="Profilage désactivé (SCRAPER_PROFILING=0)"
+        )
+
+    try:
+        result, profile = await run_in_threadpool(
+            profile_call, scrape_products_api, request.search_query, request.num_products, request.delay,
+            market=request.market, export_format=request.export_format,
+            description={'search_query': request.search_query, 'num_products': request.num_products,
+                         'market': request.market}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du scraping: {str(e)}"
+        )
+
+    response = build_scraping_response(request.search_query, result)
+    response.profile = {**profile, 'url': f"/profiles/{profile['id']}"}
+    return response
+
+def format_stream_frame(frame: Dict, stream_format: str) -> str:
+    """Sérialise une trame en NDJSON (une ligne JSON) ou en Server-Sent Events"""
+    data = json.dumps(frame, ensure_ascii=False, default=str)
+    if stream_format == 'sse':
+        return f"event: {frame['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+def stream_scraping(request: ScrapingRequest, stream_format: str):
+    """
+    Générateur des trames du flux : un produit par trame dès que sa page est
+    analysée, puis une trame finale de statistiques (ou d'erreur)
+    """
+    key = make_result_key(request.search_query, request.num_products, request.market,
+                          request.export_format)
+    cached = result_cache.get(key)
+    if cached is not None:
+        for product in cached['products']:
+            yield format_stream_frame({'type': 'product', 'page': None, 'product': product.to_dict()}, stream_format)
+        yield format_stream_frame({'type': 'stats', 'success': cached['success'], 'cached': True,
+                                   'stats': cached['stats']}, stream_format)
+        return
+
+    SCRAPES_IN_PROGRESS.inc()
+    try:
+        lang_code = resolve_lang_code(request.search_query, request.market)
+        products = []
+        seen = SeenAsins()
+        with create_exporter(request.search_query, request.export_format) as exporter:
+            for page, page_products in iter_product_pages(request.search_query, request.num_products,
+                                                          request.delay, market=lang_code, seen=seen):
+                products.extend(page_products)
+                save_page(exporter, page_products, request.search_query, lang_code)
+                for product in page_products:
+                    yield format_stream_frame({'type': 'product', 'page': page, 'product': product.to_dict()}, stream_format)
+
+            result = finalize_results(products, request.search_query, lang_code, verbose=False,
+                                      exporter=exporter, duplicates=seen.duplicates, pages=seen.pages)
+        result_cache.put(key, result)
+        yield format_stream_frame({'type': 'stats', 'success': result['success'], 'cached': False,
+                                   'stats': result['stats']}, stream_format)
+    except Exception as e:
+        yield format_stream_frame({'type': 'error', 'error': f"Erreur lors du scraping: {str(e)}"}, stream_format)
+    finally:
+        SCRAPES_IN_PROGRESS.dec()
+
+@app.post("/scrape/stream")
+async def scrape_products_stream(request: ScrapingRequest, format: str = 'ndjson'):
+    """
+    Scraper des produits Amazon en flux
+
+    Les produits sont envoyés page par page dès leur extraction, suivis d'une trame
+    finale de statistiques.
+
+    - **format**: `ndjson` (une ligne JSON par trame) ou `sse` (Server-Sent Events)
+    """
+    validate_market(request.market)
+    validate_export_format(request.export_format)
+    if format not in ('ndjson', 'sse'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format de flux inconnu: {format}"
+        )
+
+    media_type = 'text/event-stream' if format == 'sse' else 'application/x-ndjson'
+    return StreamingResponse(stream_scraping(request, format), media_type=media_type)
+
+@app.post("/scrape/batch", response_model=BatchScrapingResponse)
+async def scrape_batch_endpoint(request: BatchScrapingRequest):
+    """
+    Scraper une liste de requêtes en un seul appel
+
+    Les pages sont ordonnancées par domaine : les domaines (amazon.fr, amazon.de...)
+    avancent en parallèle, et les requêtes d'un même domaine sont entrelacées page
+    par page au rythme du limiteur adaptatif de ce domaine.
+
+    - **queries**: Termes de recherche
+    - **markets**: Marché par requête (optionnel, même longueur que queries)
+    - **export_format**: Format des fichiers générés (csv, csv.gz, ndjson, parquet, arrow)
+    """
+    if request.markets is not None and len(request.markets) != len(request.queries):
+        raise HTTPException(
+            status_code=400,
+            detail="markets doit avoir autant d'éléments que queries"
+        )
+    for market in request.markets or []:
+        validate_market(market)
+    validate_export_format(request.export_format)
+
+    started = datetime.now()
+    try:
+        results = await run_in_threadpool(
+            scrape_batch, request.queries, request.markets, request.num_products, request.delay,
+            request.export_format
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du scraping: {str(e)}"
+        )
+
+    responses = []
+    for index, (search_query, result) in enumerate(zip(request.queries, results)):
+        market = request.markets[index] if request.markets else None
+        result_cache.put(make_result_key(search_query, request.num_products, market, request.export_format),
+                         result)
+        responses.append(build_scraping_response(search_query, result))
+
+    return BatchScrapingResponse(
+        total_queries=len(responses),
+        successful_queries=sum(1 for response in responses if response.success),
+        elapsed_seconds=(datetime.now() - started).total_seconds(),
+        results=responses
+    )
+
+@app.post("/scrape/refresh", response_model=RefreshResponse)
+async def refresh_products_endpoint(request: ScrapingRequest):
+    """
+    Rafraîchir une recherche déjà scrapée et ne retourner que les différences
+
+    Les pages inchangées depuis la passe précédente (304 ou même empreinte) ne sont
+    pas analysées. Chaque différence porte un ASIN et un type : new, changed
+    (prix, note ou nombre d'avis, avec anciennes et nouvelles valeurs) ou disappeared.
+    Aucun fichier n'est généré (export_format est ignoré).
+    """
+    validate_market(request.market)
+
+    try:
+        result = await run_in_threadpool(refresh_products, request.search_query, request.num_products,
+                                         request.market)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors du rafraîchissement: {str(e)}"
+        )
+
+    stats = result.get('stats', {})
+    return RefreshResponse(
+        success=result['success'],
+        search_query=request.search_query,
+        lang_code=stats.get('lang_code', 'unknown'),
+        changes=result['changes'],
+        stats=stats,
+        error=result.get('error')
+    )
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: ScrapingRequest):
+    """
+    Soumettre un scraping en tâche de fond
+
+    Retourne immédiatement l'identifiant du job, à consulter via GET /jobs/{job_id}.
+    """
+    validate_market(request.market)
+    validate_export_format(request.export_format)
+
+    params = {
+        'search_query': request.search_query,
+        'num_products': request.num_products,
+        'delay': request.delay,
+        'market': request.market,
+        'export_format': request.export_format
+    }
+    cached = result_cache.get(make_result_key(request.search_query, request.num_products, request.market,
+                                              request.export_format))
+    if cached is not None:
+        job = job_manager.create_done(cached, **params)
+    else:
+        job = job_manager.submit(**params)
+    return JobResponse(**job.to_dict())
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Consulter l'état d'un job : progression (pages traitées, produits trouvés)
+    puis résultat final une fois terminé
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job {job_id} non trouvé"
+        )
+
+    response = JobResponse(**job.to_dict())
+    if job.result is not None:
+        response.result = build_scraping_response(job.params['search_query'], job.result)
+        response.products = [product.to_dict() for product in job.result.get('products', [])]
+    return response
+
 @app.get("/download/{filename}")
-async def download_csv(filename: str):
+async def download_csv(filename: str, request: Request):
     """
-    Télécharger un fichier CSV généré
+    Télécharger un fichier d'export généré (CSV, CSV gzip, NDJSON, Parquet, Arrow)
     
-    - **filename**: Nom du fichier CSV à télécharger
+    - **filename**: Nom du fichier à télécharger
+
+    Les fichiers sont servis depuis le répertoire d'export (SCRAPER_EXPORT_DIR), avec
+    un ETag calculé sur le contenu (If-None-Match : 304), les requêtes Range (206)
+    et une compression gzip à la volée si le client l'accepte.
     """
-    file_path = filename
+    store = get_export_store()
+    file_path = store.resolve(filename)
     
-    if not os.path.exists(file_path):
+    if file_path is None:
         raise HTTPException(
             status_code=404, 
             detail=f"Fichier {filename} non trouvé"
         )
-    
+
+    etag = await run_in_threadpool(store.etag, file_path)
+    size = os.path.getsize(file_path)
+    media_type = media_type_for(filename)
+    range_header = request.headers.get('range')
+    compress = range_header is None and accepts_gzip(file_path, request.headers.get('accept-encoding'))
+
+    headers = {
+        'ETag': etag[:-1] + '-gzip"' if compress else etag,
+        'Cache-Control': 'no-cache',
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    }
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    else:
+        headers['Accept-Ranges'] = 'bytes'
+    if compressible(file_path):
+        headers['Vary'] = 'Accept-Encoding'
+
+    if etag_matches(request.headers.get('if-none-match'), headers['ETag']):
+        headers.pop('Content-Encoding', None)
+        return Response(status_code=304, headers=headers)
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}', 'ETag': etag})
+
+    if byte_range is not None:
+        start, end = byte_range
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        headers['Content-Length'] = str(end - start + 1)
+        return StreamingResponse(iter_file(file_path, start, end), status_code=206,
+                                 headers=headers, media_type=media_type)
+
+    if compress:
+        return StreamingResponse(iter_gzip(file_path), headers=headers, media_type=media_type)
+
     return FileResponse(
         path=file_path,
-        filename=filename,
-        media_type='text/csv'
+        headers=headers,
+        media_type=media_type
     )
 
+@app.get("/products/top")
+async def get_top_products(query: Optional[str] = None, market: Optional[str] = None,
+                           days: Optional[float] = None, limit: int = 20, order: str = 'score'):
+    """
+    Meilleurs produits enregistrés au fil des scrapings (base produits)
+
+    - **query**: Recherche ayant trouvé les produits (optionnel)
+    - **market**: Marché Amazon (optionnel)
+    - **days**: Produits vus depuis N jours (7 : cette semaine)
+    - **limit**: Nombre de produits (1-500)
+    - **order**: `score` (défaut), `price` ou `recent`
+    """
+    store = get_product_store()
+    if store is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Base produits désactivée (SCRAPER_DB_PATH)"
+        )
+    validate_market(market)
+    if order not in ORDERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Tri inconnu: {order}"
+        )
+    if not 1 <= limit <= 500:
+        raise HTTPException(
+            status_code=400,
+            detail="limit doit être compris entre 1 et 500"
+        )
+
+    products = await run_in_threadpool(store.top_products, query, market, days, limit, order)
+    return {"query": query, "market": market, "days": days, "total": len(products), "products": products}
+
+@app.get("/profiles")
+async def list_profiles():
+    """Rapports de profilage disponibles (les plus récents d'abord)"""
+    profiles = await run_in_threadpool(get_profile_store().list)
+    return {"total": len(profiles), "profiles": profiles}
+
+@app.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, format: str = 'json'):
+    """
+    Télécharger le rapport d'un scraping profilé
+
+    - **format**: `json` (fonctions les plus coûteuses, spans, piles) ou `folded`
+      (piles repliées pour flamegraph.pl / speedscope)
+    """
+    if format not in ('json', 'folded'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format de rapport inconnu: {format}"
+        )
+    report = await run_in_threadpool(get_profile_store().load, profile_id)
+    if report is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Rapport {profile_id} non trouvé"
+        )
+
+    if format == 'folded':
+        return Response('\n'.join(report['folded']) + '\n', media_type='text/plain; charset=utf-8',
+                        headers={'Content-Disposition': f'attachment; filename="{profile_id}.folded"'})
+    return Response(json.dumps(report, ensure_ascii=False), media_type='application/json',
+                    headers={'Content-Disposition': f'attachment; filename="{profile_id}.json"'})
+
+@app.get("/metrics")
+async def get_metrics():
+    """Métriques au format Prometheus (503 sans prometheus_client)"""
+    if not PROMETHEUS_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Métriques indisponibles : installer prometheus_client"
+        )
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/stats")
 async def get_api_stats():
     """Obtenir les statistiques de l'API"""
@@ -144,10 +767,13 @@ async def get_api_stats():
             "Détection automatique de langue",
             "Support multi-langues (FR, EN, AR, DE, IT, ES, UK, CA, JP, IN)",
             "Calcul de score gagnant",
-            "Export CSV automatique",
+            "Export CSV, CSV gzip, NDJSON, Parquet et Arrow",
             "Statistiques détaillées",
             "Gestion d'erreurs robuste"
         ],
+        "export_formats": available_formats(),
+        "exports": get_export_store().stats(),
+        "product_store": get_product_store().stats() if get_product_store() else {},
         "supported_languages": {
             "fr": "Français - Amazon.fr",
             "ar": "Arabe - Amazon.sa",
@@ -160,6 +786,13 @@ async def get_api_stats():
             "jp": "Japonais - Amazon.co.jp",
             "in": "Indien - Amazon.in"
         },
+        "selector_plans": selector_plan_stats(),
+        "response_cache": get_response_cache().stats() if get_response_cache else {},
+        "result_cache": result_cache.stats(),
+        "jobs": job_manager.stats(),
+        "rate_limiters": rate_limiter_stats(),
+        "market_resolver": market_resolver_stats(),
+        "startup": startup,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Moteur d'extraction HTML compilé (lxml)
+Les sélecteurs CSS sont traduits en XPath et compilés une seule fois,
+puis appliqués directement sur l'arbre lxml de chaque résultat
+"""
+
+import io
+import threading
+from collections import Counter
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    from cssselect import HTMLTranslator
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Champs dont on extrait un attribut href plutôt que le texte
+HREF_FIELDS = ('link',)
+
+# Champs sans lesquels un produit est rejeté : jamais abandonnés par un plan
+REQUIRED_FIELDS = ('name', 'price')
+
+if LXML_AVAILABLE:
+    # Texte complet d'un sous-arbre (équivalent de text_content, aussi pour les éléments etree)
+    TEXT_CONTENT = etree.XPath('string()', smart_strings=False)
+
+def compile_css(selector: str, prefix: str = 'descendant::'):
+    """Compile un sélecteur CSS en expression XPath réutilisable"""
+    return etree.XPath(HTMLTranslator().css_to_xpath(selector, prefix=prefix), smart_strings=False)
+
+# Balises suivies par l'analyse restreinte : les div (blocs de résultats et conteneurs)
+# et les balises lourdes à vider ; les autres ne génèrent aucun événement
+RESTRICTED_PARSE_TAGS = ('div', 'script', 'style', 'noscript', 'svg', 'iframe')
+
+def is_search_result(element) -> bool:
+    """Vrai pour un bloc de résultat .s-result-item[data-component-type="s-search-result"]"""
+    return (element.get('data-component-type') == 's-search-result'
+            and 's-result-item' in (element.get('class') or '').split())
+
+def iter_search_results(html: str) -> Iterator:
+    """
+    Parse une page en ne conservant que les blocs div s-search-result
+
+    Les autres div et les balises lourdes (scripts, styles, svg) sont vidés dès
+    leur fermeture, et l'analyse s'arrête dès que l'appelant cesse d'itérer.
+    """
+    source = io.BytesIO(html.encode('utf-8'))
+    depth = 0  # > 0 à l'intérieur d'un bloc de résultat
+    ancestors = set()  # conteneurs des résultats déjà émis, à ne pas vider
+    events = etree.iterparse(source, events=('start', 'end'), tag=RESTRICTED_PARSE_TAGS,
+                             html=True, encoding='utf-8')
+    for event, element in events:
+        if event == 'start':
+            if depth or is_search_result(element):
+                depth += 1
+            continue
+
+        if depth:
+            depth -= 1
+            if depth == 0:
+                ancestors.update(element.iterancestors())
+                yield element
+        elif element not in ancestors:
+            element.clear()
+
+class CompiledExtractor:
+    """Extracteur de produits dont les sélecteurs sont compilés une seule fois"""
+
+    def __init__(self, selectors: Dict[str, List[str]], item_selectors: List[str]):
+        if not LXML_AVAILABLE:
+            raise RuntimeError("lxml et cssselect sont requis pour l'extracteur compilé")
+
+        self.item_selectors = list(item_selectors)
+        self.items = [compile_css(sel, prefix='descendant-or-self::') for sel in item_selectors]
+        self.fields = {
+            field: [compile_css(sel) for sel in field_selectors]
+            for field, field_selectors in selectors.items()
+        }
+
+    @staticmethod
+    def parse(html: str):
+        """Construit l'arbre lxml d'une page"""
+        return lxml_html.fromstring(html)
+
+    def find_items(self, root) -> list:
+        """Retourne les blocs de résultats selon la chaîne de conteneurs"""
+        for xpath in self.items:
+            items = xpath(root)
+            if items:
+                return items
+        return []
+
+    def value(self, field: str, index: int, item, base_url: str) -> Optional[str]:
+        """Valeur d'un champ selon un seul sélecteur (texte, ou lien absolu), None si absente"""
+        found = self.fields[field][index](item)
+        if not found:
+            return None
+        if field in HREF_FIELDS:
+            href = found[0].get('href')
+            if not href:
+                return None
+            return href if href.startswith('http') else urljoin(base_url, href)
+        return TEXT_CONTENT(found[0]).strip() or None
+
+    def first_match(self, field: str, item, base_url: str, skip=()) -> Tuple[Optional[int], Optional[str]]:
+        """Parcourt la chaîne de fallbacks d'un champ, retourne (indice gagnant, valeur)"""
+        for index in range(len(self.fields[field])):
+            if index in skip:
+                continue
+            value = self.value(field, index, item, base_url)
+            if value is not None:
+                return index, value
+        return None, None
+
+    def extract(self, item, base_url: str) -> Dict[str, Optional[str]]:
+        """Extrait tous les champs bruts (texte ou lien) d'un bloc de résultat"""
+        return {field: self.first_match(field, item, base_url)[1] for field in self.fields}
+
+class SelectorPlan:
+    """Sélecteurs retenus pour un layout : conteneur gagnant et ordre utile par champ"""
+
+    def __init__(self, item_index: int, fields: Dict[str, List[int]]):
+        self.item_index = item_index
+        self.fields = fields
+
+    @property
+    def fingerprint(self) -> str:
+        """Empreinte lisible du layout (indices des sélecteurs gagnants)"""
+        fields = ';'.join(f"{field}={','.join(map(str, order)) or '-'}" for field, order in self.fields.items())
+        return f"items={self.item_index};{fields}"
+
+class PageExtraction:
+    """Extraction d'une page selon un plan, avec comptage des ratés et des sélecteurs gagnants"""
+
+    def __init__(self, cache: 'SelectorPlanCache', domain: str, plan: SelectorPlan, items: Iterable):
+        self.cache = cache
+        self.domain = domain
+        self.plan = plan
+        self.items = items
+        self.extracted = 0
+        self.fallbacks = 0
+        self.hits: Counter = Counter()  # (champ, indice du sélecteur) -> valeurs trouvées
+        self.plan_hit = False  # plan repris du cache (sinon sondé pour cette page)
+        self.invalidated = False
+
+    def extract(self, item, base_url: str) -> Dict[str, Optional[str]]:
+        """
+        Extrait les champs avec les sélecteurs du plan
+
+        Les champs obligatoires absents repassent par la chaîne complète (raté
+        compté) ; un champ optionnel sans gagnant au sondage a toute sa chaîne dans le plan.
+        """
+        extractor = self.cache.extractor
+        self.extracted += 1
+        fields = {}
+        for field, order in self.plan.fields.items():
+            value = None
+            for index in order:
+                value = extractor.value(field, index, item, base_url)
+                if value is not None:
+                    break
+            if value is None and field in self.cache.required_fields:
+                self.fallbacks += 1
+                index, value = extractor.first_match(field, item, base_url, skip=order)
+            if value is not None:
+                self.hits[field, index] += 1
+            fields[field] = value
+        return fields
+
+    def plan_stats(self) -> Dict:
+        """Compteurs du cache de plans pour cette page et plan retenu ensuite (None si invalidé)"""
+        return {
+            'hits': int(self.plan_hit),
+            'misses': int(not self.plan_hit),
+            'invalidations': int(self.invalidated),
+            'field_fallbacks': self.fallbacks,
+            'plan': None if self.invalidated else self.plan.fingerprint
+        }
+
+    def close(self) -> Tuple[Dict[Tuple[str, int], int], Dict]:
+        """
+        Invalide le plan si trop de champs obligatoires l'ont raté sur cette page
+
+        Returns:
+            Sélecteurs gagnants de la page ({(champ, indice): valeurs trouvées})
+            et compteurs du cache de plans pour cette page (plan_stats)
+        """
+        self.cache.record_page(self, self.extracted, self.fallbacks)
+        return dict(self.hits), self.plan_stats()
+
+class SelectorPlanCache:
+    """
+    Plans de sélecteurs par domaine
+
+    Le layout d'une page est sondé sur quelques résultats ; le plan obtenu est
+    réutilisé pour les pages suivantes du même domaine tant qu'il continue de
+    correspondre, puis sondé à nouveau.
+    """
+
+    def __init__(self, extractor: CompiledExtractor, probe_size: int = 10,
+                 max_miss_ratio: float = 0.5, required_fields=REQUIRED_FIELDS):
+        self.extractor = extractor
+        self.probe_size = probe_size
+        self.max_miss_ratio = max_miss_ratio
+        self.required_fields = tuple(required_fields)
+        self._plans: Dict[str, SelectorPlan] = {}
+        self._reported: Dict[str, str] = {}  # empreintes des plans des workers d'analyse
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.field_fallbacks = 0
+
+    def probe(self, root, base_url: str) -> Tuple[Optional[SelectorPlan], list]:
+        """Détermine le conteneur et les sélecteurs gagnants d'une page"""
+        for item_index, xpath in enumerate(self.extractor.items):
+            items = xpath(root)
+            if items:
+                break
+        else:
+            return None, []
+
+        return SelectorPlan(item_index, self.probe_fields(items[:self.probe_size], base_url)), items
+
+    def probe_fields(self, sample: list, base_url: str) -> Dict[str, List[int]]:
+        """
+        Classe, pour chaque champ, les sélecteurs gagnants sur un échantillon de résultats
+
+        Un champ optionnel (badge...) peut manquer sur tout l'échantillon sans manquer
+        sur la page : sans gagnant, il garde toute sa chaîne de fallbacks.
+        """
+        fields = {}
+        for field, selectors in self.extractor.fields.items():
+            wins = Counter()
+            for item in sample:
+                index, _ = self.extractor.first_match(field, item, base_url)
+                if index is not None:
+                    wins[index] += 1
+            order = [index for index, _ in wins.most_common()]
+            if not order and field not in self.required_fields:
+                order = list(range(len(selectors)))
+            fields[field] = order
+        return fields
+
+    def open_page(self, domain: str, root, base_url: str) -> Optional[PageExtraction]:
+        """Prépare l'extraction d'une page, None si elle ne contient aucun résultat"""
+        plan = self._plans.get(domain)
+        if plan is not None:
+            items = self.extractor.items[plan.item_index](root)
+            if items:
+                with self._lock:
+                    self.hits += 1
+                page = PageExtraction(self, domain, plan, items)
+                page.plan_hit = True
+                return page
+
+        plan, items = self.probe(root, base_url)
+        with self._lock:
+            self.misses += 1
+            if plan is None:
+                self._plans.pop(domain, None)
+                return None
+            self._plans[domain] = plan
+        return PageExtraction(self, domain, plan, items)
+
+    def open_results(self, domain: str, results: Iterable, item_index: int,
+                     base_url: str) -> Optional[PageExtraction]:
+        """
+        Prépare l'extraction d'un flux de résultats déjà isolés (analyse restreinte)
+
+        Le plan est sondé sur les premiers résultats du flux si le domaine n'en
+        a pas, ou si son conteneur gagnant n'est pas celui du flux.
+        """
+        results = iter(results)
+        sample = list(islice(results, self.probe_size))
+        if not sample:
+            return None
+
+        plan = self._plans.get(domain)
+        plan_hit = plan is not None and plan.item_index == item_index
+        if plan_hit:
+            with self._lock:
+                self.hits += 1
+        else:
+            plan = SelectorPlan(item_index, self.probe_fields(sample, base_url))
+            with self._lock:
+                self.misses += 1
+                self._plans[domain] = plan
+        page = PageExtraction(self, domain, plan, chain(sample, results))
+        page.plan_hit = plan_hit
+        return page
+
+    def record_page(self, page: PageExtraction, extracted: int, fallbacks: int):
+        """Comptabilise les ratés d'une page et invalide le plan si nécessaire"""
+        with self._lock:
+            self.field_fallbacks += fallbacks
+            max_fallbacks = extracted * len(self.required_fields) * self.max_miss_ratio
+            if extracted and fallbacks > max_fallbacks and self._plans.get(page.domain) is page.plan:
+                del self._plans[page.domain]
+                self.invalidations += 1
+                page.invalidated = True
+
+    def merge(self, domain: str, page_stats: Dict):
+        """Ajoute les compteurs d'une page analysée dans un autre processus (pool d'analyse)"""
+        with self._lock:
+            self.hits += page_stats.get('hits', 0)
+            self.misses += page_stats.get('misses', 0)
+            self.invalidations += page_stats.get('invalidations', 0)
+            self.field_fallbacks += page_stats.get('field_fallbacks', 0)
+            if page_stats.get('plan'):
+                self._reported[domain] = page_stats['plan']
+            else:
+                self._reported.pop(domain, None)
+
+    def get_plan(self, domain: str) -> Optional[SelectorPlan]:
+        """Plan actuellement retenu pour un domaine"""
+        return self._plans.get(domain)
+
+    def stats(self) -> Dict:
+        """Compteurs du cache de plans (pages analysées ici et dans les workers)"""
+        with self._lock:
+            plans = dict(self._reported)
+            plans.update((domain, plan.fingerprint) for domain, plan in self._plans.items())
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'field_fallbacks': self.field_fallbacks,
+                'plans': plans
+            }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Client HTTP partagé pour le scraping Amazon
+Une session poolée (keep-alive) par domaine, réutilisée entre les scrapes,
+avec HTTP/2 et décodage brotli quand les dépendances optionnelles sont installées
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# HTTP/2 via httpx (optionnel : pip install "httpx[http2]")
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+# Décodage brotli (utilisé par urllib3 et httpx s'il est installé)
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# Nombre de connexions conservées par domaine
+POOL_SIZE = int(os.environ.get('SCRAPER_POOL_SIZE', '10'))
+
+# Désactivation explicite de HTTP/2 (SCRAPER_HTTP2=0)
+USE_HTTP2 = HTTP2_AVAILABLE and os.environ.get('SCRAPER_HTTP2', '1') != '0'
+
+# Exceptions réseau à intercepter, quel que soit le client utilisé
+HTTP_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx is not None else ())
+
+def accept_encoding() -> str:
+    """N'annonce brotli que si la réponse pourra réellement être décodée"""
+    return 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+
+def domain_of(url: str) -> str:
+    """Retourne le domaine (schéma + hôte) d'une URL, clé du pool"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class HTTPClientPool:
+    """Pool de sessions HTTP, une par domaine Amazon"""
+
+    def __init__(self, pool_size: int = POOL_SIZE, http2: bool = USE_HTTP2,
+                 headers: Optional[Dict[str, str]] = None):
+        self.pool_size = pool_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.headers = dict(headers or {})
+        self.headers['Accept-Encoding'] = accept_encoding()
+        if self.http2:
+            # En-tête interdit en HTTP/2, la connexion est persistante par défaut
+            self.headers.pop('Connection', None)
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _create_client(self):
+        if self.http2:
+            limits = httpx.Limits(max_connections=self.pool_size,
+                                  max_keepalive_connections=self.pool_size)
+            return httpx.Client(http2=True, headers=self.headers, limits=limits,
+                                follow_redirects=True)
+
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def get_client(self, base_domain: str):
+        """Retourne (en la créant au besoin) la session associée à un domaine"""
+        client = self._clients.get(base_domain)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(base_domain)
+                if client is None:
+                    client = self._create_client()
+                    self._clients[base_domain] = client
+        return client
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30):
+        """Requête GET via la session du domaine de l'URL"""
+        client = self.get_client(domain_of(url))
+        return client.get(url, headers=headers, timeout=timeout)
+
+    def warm_up(self, base_domains: Iterable[str], timeout: float = 10) -> Dict[str, bool]:
+        """Ouvre à l'avance les connexions (TCP + TLS) vers les domaines donnés"""
+        results = {}
+        for base_domain in base_domains:
+            try:
+                self.get_client(base_domain).head(base_domain, timeout=timeout)
+                results[base_domain] = True
+            except HTTP_ERRORS:
+                results[base_domain] = False
+        return results
+
+    def domains(self):
+        """Liste des domaines ayant une session ouverte"""
+        return list(self._clients)
+
+    def close(self):
+        """Ferme toutes les sessions"""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+_default_pool: Optional[HTTPClientPool] = None
+_default_pool_lock = threading.Lock()
+
+def get_http_pool(headers: Optional[Dict[str, str]] = None) -> HTTPClientPool:
+    """Retourne le pool partagé du processus (les en-têtes ne servent qu'à sa création)"""
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = HTTPClientPool(headers=headers)
+    return _default_pool
+
+def configured_warmup_markets() -> list:
+    """Marchés à préchauffer au démarrage (SCRAPER_WARMUP_MARKETS=fr,en,de)"""
+    value = os.environ.get('SCRAPER_WARMUP_MARKETS', '')
+    return [market.strip() for market in value.split(',') if market.strip()]
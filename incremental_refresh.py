@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Rafraîchissement incrémental d'une recherche suivie
+Chaque page est comparée à l'empreinte de la passe précédente (requête
+conditionnelle si le serveur fournit ETag / Last-Modified, empreinte du contenu
+sinon) : les pages inchangées ne sont pas analysées, et seules les différences
+par ASIN sont retournées (nouveaux produits, prix, note ou avis modifiés,
+produits disparus)
+"""
+
+import hashlib
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from http_client import HTTP_ERRORS
+from product_store import get_product_store
+from scrape_products_enhanced import (
+    MAX_PAGES, SeenAsins, fetch_search_page_conditional, get_amazon_domain, parse_page, resolve_lang_code
+)
+
+# Parties d'une page qui changent à chaque requête sans que les résultats changent :
+# scripts (jetons, horodatages) et paramètres de suivi des liens (qid, sr, ref)
+VOLATILE_PATTERN = re.compile(r'<script\b.*?</script>|[?&;](?:amp;)?(?:qid|sr|ref_?)=[^&"\'\s>]*',
+                              re.IGNORECASE | re.DOTALL)
+
+# Champs comparés d'une passe à l'autre : attribut du produit -> colonne de la base
+TRACKED_FIELDS = {'price': 'price', 'rating': 'rating', 'review_count': 'review_count'}
+
+# Types de différence
+NEW = 'new'
+CHANGED = 'changed'
+DISAPPEARED = 'disappeared'
+
+def page_fingerprint(html: str) -> str:
+    """Empreinte du contenu d'une page, parties volatiles exclues"""
+    return hashlib.sha256(VOLATILE_PATTERN.sub('', html).encode('utf-8')).hexdigest()
+
+def product_changes(product, previous: Dict) -> Dict[str, List]:
+    """Champs suivis dont la valeur a changé : {champ: [ancienne, nouvelle]}"""
+    return {field: [previous[column], getattr(product, field)]
+            for field, column in TRACKED_FIELDS.items()
+            if previous[column] != getattr(product, field)}
+
+def refresh_products(search_query: str, num_products: int = 50, market: Optional[str] = None,
+                     verbose: bool = False,
+                     progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Relit une recherche déjà scrapée et ne retourne que les différences
+
+    Les pages sont relues dans l'ordre, comme scrape_products. Une page inchangée
+    (304 Not Modified ou même empreinte) reprend les ASIN de la passe précédente
+    sans extraction ; une page modifiée est analysée, ses produits comparés aux
+    derniers enregistrés, puis enregistrés. Les ASIN des pages relues absents de
+    cette passe sont signalés comme disparus. Sans passe précédente, les produits
+    déjà enregistrés pour la recherche (scraping classique) ne sont pas nouveaux ;
+    la première passe d'une recherche jamais scrapée les signale tous comme nouveaux.
+
+    Returns:
+        Dict avec 'changes' (une entrée par ASIN : type, produit au format dict,
+        champs modifiés) et 'stats' (pages relues, inchangées, nombre par type)
+    """
+    store = get_product_store()
+    if store is None:
+        raise ValueError("Le rafraîchissement incrémental nécessite le stockage des produits (SCRAPER_DB_PATH)")
+
+    lang_code = resolve_lang_code(search_query, market, verbose)
+    base_domain = get_amazon_domain(lang_code)
+    snapshots = store.page_snapshots(search_query, lang_code)
+    # ASIN de toute la passe précédente (ou, à défaut, des scrapings de la recherche) :
+    # ceux qui n'y figurent pas sont nouveaux
+    known_asins = {asin for snapshot in snapshots.values() for asin in snapshot['asins']}
+    if not snapshots:
+        known_asins = store.search_asins(search_query, lang_code)
+
+    seen = SeenAsins()
+    changes = []
+    previous_asins = set()
+    total = 0
+    pages_done = 0
+    unchanged_pages = 0
+    not_modified = 0
+    unchanged = 0
+    page = 1
+
+    while total < num_products and page <= MAX_PAGES:
+        snapshot = snapshots.get(page)
+        try:
+            html, validators = fetch_search_page_conditional(
+                base_domain, search_query, page,
+                etag=snapshot['etag'] if snapshot else None,
+                last_modified=snapshot['last_modified'] if snapshot else None
+            )
+        except HTTP_ERRORS as e:
+            if verbose:
+                print(f"❌ Erreur requête HTTP: {e}")
+            break
+
+        fetched_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        content_hash = page_fingerprint(html) if html is not None else snapshot['content_hash']
+        if snapshot:
+            previous_asins.update(snapshot['asins'])
+
+        if snapshot and content_hash == snapshot['content_hash']:
+            # Page inchangée : pas d'extraction, les produits de la passe précédente restent valables
+            not_modified += html is None
+            unchanged_pages += 1
+            page_asins = [asin for asin in snapshot['asins'] if asin not in seen.asins]
+            seen.asins.update(page_asins)
+            page_asins = page_asins[:num_products - total]
+            unchanged += len(page_asins)
+            store.touch(page_asins, lang_code, search_query, fetched_at)
+            store.save_page_snapshot(search_query, lang_code, page, content_hash, snapshot['asins'],
+                                     validators['etag'], validators['last_modified'], fetched_at)
+            count = len(page_asins)
+        else:
+            parsed = parse_page(html, base_domain, lang_code, verbose=verbose, seen_asins=seen.asins)
+            del html
+            if parsed is None:
+                if verbose:
+                    print("❌ Plus de résultats trouvés, arrêt du rafraîchissement.")
+                break
+
+            page_products = seen.accept(parsed)
+            store.save_page_snapshot(search_query, lang_code, page, content_hash,
+                                     [product.asin for product in page_products if product.asin],
+                                     validators['etag'], validators['last_modified'], fetched_at)
+            page_products = page_products[:num_products - total]
+
+            known = store.get_products((product.asin for product in page_products if product.asin), lang_code)
+            for product in page_products:
+                previous = known.get(product.asin)
+                if previous is None or product.asin not in known_asins:
+                    changes.append({'type': NEW, 'asin': product.asin, 'product': product.to_dict()})
+                    continue
+                fields = product_changes(product, previous)
+                if fields:
+                    changes.append({'type': CHANGED, 'asin': product.asin, 'product': product.to_dict(),
+                                    'changes': fields})
+                else:
+                    unchanged += 1
+            store.upsert_page(page_products, lang_code, search_query)
+            count = len(page_products)
+
+        if not count:
+            if verbose:
+                print("⚠️ Aucun nouveau produit sur cette page, arrêt du rafraîchissement.")
+            break
+
+        total += count
+        pages_done = page
+        if progress_callback:
+            progress_callback({'pages_done': page, 'products_so_far': total})
+        page += 1
+
+    for asin in sorted(previous_asins - seen.asins):
+        changes.append({'type': DISAPPEARED, 'asin': asin, 'product': None})
+
+    counts = {kind: sum(1 for change in changes if change['type'] == kind) for kind in (NEW, CHANGED, DISAPPEARED)}
+    stats = {
+        'search_query': search_query,
+        'lang_code': lang_code,
+        'refresh_date': datetime.now().isoformat(),
+        'pages': pages_done,
+        'unchanged_pages': unchanged_pages,
+        'not_modified': not_modified,
+        'unchanged': unchanged,
+        'duplicates': seen.duplicates,
+        **counts
+    }
+    if verbose:
+        print(f"🔄 {pages_done} page(s) relue(s), {unchanged_pages} inchangée(s) : "
+              f"{counts[NEW]} nouveau(x), {counts[CHANGED]} modifié(s), {counts[DISAPPEARED]} disparu(s)")
+
+    return {
+        'changes': changes,
+        'stats': stats,
+        'success': pages_done > 0
+    }
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Jobs de scraping asynchrones pour l'API
+Les scrapings longs sont soumis, exécutés sur un pool de workers borné
+hors de la boucle d'événements, puis consultés par identifiant
+"""
+
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+JOB_WORKERS = int(os.environ.get('SCRAPER_JOB_WORKERS', '4'))
+JOB_RETENTION = int(os.environ.get('SCRAPER_JOB_RETENTION', '1000'))
+
+# États d'un job
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+class Job:
+    """Un scraping soumis, avec sa progression et son résultat"""
+
+    def __init__(self, params: Dict):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = PENDING
+        self.progress = {'pages_done': 0, 'products_so_far': 0}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def update_progress(self, progress: Dict):
+        """Callback de progression appelée par le scraper après chaque page"""
+        self.progress = dict(progress)
+
+    def to_dict(self) -> Dict:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'params': self.params,
+            'progress': self.progress,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+class JobManager:
+    """Exécute les jobs sur un pool de threads borné et conserve les plus récents"""
+
+    def __init__(self, runner: Callable[..., Dict], max_workers: int = JOB_WORKERS,
+                 retention: int = JOB_RETENTION):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scrape-job')
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, **params) -> Job:
+        """Crée un job et le place dans la file du pool"""
+        job = Job(params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job
+
+    def create_done(self, result: Dict, **params) -> Job:
+        """Enregistre un job déjà terminé (résultat servi par un cache)"""
+        job = Job(params)
+        job.status = DONE
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        job.progress = {'pages_done': 0, 'products_so_far': len(result.get('products', []))}
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        return job
+
+    def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = datetime.now().isoformat()
+        try:
+            job.result = self.runner(progress_callback=job.update_progress, **job.params)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now().isoformat()
+
+    def _prune(self):
+        """Oublie les jobs terminés les plus anciens au-delà de la rétention"""
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Retourne un job par identifiant"""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict:
+        """Nombre de jobs par état"""
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts['workers'] = self.max_workers
+        return counts
+
+    def shutdown(self, wait: bool = False):
+        """Arrête le pool (les jobs en file sont abandonnés si wait=False)"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
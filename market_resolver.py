@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Résolution du marché Amazon d'une recherche
+Chemin rapide par écriture (arabe, japonais, devanagari), langdetect initialisé
+avec une graine fixe pour le texte latin ambigu, résultats mémorisés (LRU borné)
+"""
+
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+from response_cache import normalize_query
+
+MARKET_CACHE_SIZE = int(os.environ.get('SCRAPER_MARKET_CACHE_SIZE', '4096'))
+
+DEFAULT_MARKET = 'en'
+
+# Écritures propres à un seul marché : un caractère suffit à trancher
+SCRIPT_MARKETS = (
+    (re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]'), 'ar'),
+    (re.compile('[\u3040-\u30FF\u31F0-\u31FF\uFF66-\uFF9F\u4E00-\u9FFF]'), 'jp'),
+    (re.compile('[\u0900-\u097F]'), 'in'),
+)
+
+# Codes langdetect (ISO 639-1) vers marchés ; les autres langues vont au marché par défaut.
+# 'uk' (ukrainien) et 'ca' (catalan) ne désignent PAS les marchés britannique et canadien.
+LANGUAGE_MARKETS = {
+    'fr': 'fr',
+    'ar': 'ar',
+    'en': 'en',
+    'de': 'de',
+    'it': 'it',
+    'es': 'es',
+    'ca': 'es',
+    'ja': 'jp',
+    'hi': 'in',
+}
+
+# Texte sans lettre (références, nombres) : rien à détecter
+_HAS_LETTER = re.compile(r'[^\W\d_]')
+
+_counters_lock = threading.Lock()
+_counters = {'script': 0, 'langdetect': 0, 'default': 0}
+
+def _count(path: str):
+    with _counters_lock:
+        _counters[path] += 1
+
+@lru_cache(maxsize=1)
+def _detector():
+    """Importe langdetect à la première recherche ambiguë, avec une graine fixe (résultats déterministes)"""
+    from langdetect import DetectorFactory, LangDetectException, detect
+    DetectorFactory.seed = 0
+    return detect, LangDetectException
+
+def script_market(search_query: str) -> Optional[str]:
+    """Marché déduit de l'écriture de la recherche, ou None pour le texte latin"""
+    if search_query.isascii():
+        return None
+    for pattern, market in SCRIPT_MARKETS:
+        if pattern.search(search_query):
+            return market
+    return None
+
+@lru_cache(maxsize=MARKET_CACHE_SIZE)
+def _detect_market(normalized_query: str) -> str:
+    market = script_market(normalized_query)
+    if market is not None:
+        _count('script')
+        return market
+
+    if not _HAS_LETTER.search(normalized_query):
+        _count('default')
+        return DEFAULT_MARKET
+
+    detect, LangDetectException = _detector()
+    try:
+        language = detect(normalized_query)
+    except LangDetectException:
+        _count('default')
+        return DEFAULT_MARKET
+    _count('langdetect')
+    return LANGUAGE_MARKETS.get(language, DEFAULT_MARKET)
+
+def detect_market(search_query: str) -> str:
+    """Marché détecté depuis le texte de la recherche (mémorisé par requête normalisée)"""
+    return _detect_market(normalize_query(search_query))
+
+def resolve_market(search_query: str, market: Optional[str] = None) -> str:
+    """Retourne le marché imposé par l'appelant, ou celui détecté depuis la recherche"""
+    if market:
+        return market.lower()
+    return detect_market(search_query)
+
+def warm_up_market_resolver():
+    """Charge langdetect et ses profils de langue (sinon payés par la première recherche latine)"""
+    detect, LangDetectException = _detector()
+    try:
+        detect('warm up')
+    except LangDetectException:
+        pass
+
+def market_resolver_stats() -> Dict:
+    """Chemins de détection empruntés et état du cache LRU"""
+    info = _detect_market.cache_info()
+    with _counters_lock:
+        stats = dict(_counters)
+    stats.update({'cache_hits': info.hits, 'cache_misses': info.misses,
+                  'cache_size': info.currsize, 'cache_max_size': info.maxsize})
+    return stats
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Métriques Prometheus du scraper et de l'API
+Histogrammes par étape (téléchargement, analyse HTML, extraction, score,
+écriture de l'export, requête complète), compteurs des sélecteurs gagnants,
+des pages et des produits, jauges des scrapings en cours. Sans prometheus_client,
+les métriques sont des objets inertes et /metrics est indisponible.
+"""
+
+import contextlib
+from typing import Dict, Tuple
+
+# Exposition Prometheus (optionnel : pip install prometheus_client)
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+    PROMETHEUS_AVAILABLE = False
+
+# Bornes des histogrammes (secondes) : étapes de quelques ms, requêtes de plusieurs secondes
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REQUEST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class NoopMetric:
+    """Métrique inerte, utilisée quand prometheus_client n'est pas installé"""
+
+    def labels(self, *args, **kwargs) -> 'NoopMetric':
+        return self
+
+    def observe(self, value: float):
+        pass
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def track_inprogress(self):
+        return contextlib.nullcontext()
+
+def _metric(kind: str, name: str, documentation: str, labelnames: Tuple[str, ...] = (), **kwargs):
+    """Crée une métrique du registre par défaut, inerte sans prometheus_client"""
+    if not PROMETHEUS_AVAILABLE:
+        return NoopMetric()
+    metric_class = {'histogram': Histogram, 'counter': Counter, 'gauge': Gauge}[kind]
+    return metric_class(name, documentation, labelnames, **kwargs)
+
+FETCH_SECONDS = _metric('histogram', 'scraper_fetch_seconds',
+                        "Durée d'une tentative de téléchargement d'une page de résultats",
+                        ('domain', 'status'), buckets=FETCH_BUCKETS)
+STAGE_SECONDS = _metric('histogram', 'scraper_stage_seconds',
+                        "Durée d'une étape pour une page : parse (arbre HTML), extract (champs), "
+                        "score (conversion et score), export (écriture du fichier), store (base produits)",
+                        ('stage', 'domain'), buckets=STAGE_BUCKETS)
+REQUEST_SECONDS = _metric('histogram', 'api_request_seconds',
+                          "Durée de bout en bout d'une requête de l'API",
+                          ('method', 'route', 'status'), buckets=REQUEST_BUCKETS)
+SELECTOR_HITS = _metric('counter', 'scraper_selector_hits_total',
+                        "Valeurs trouvées par sélecteur de ROBUST_SELECTORS (indice dans la chaîne de fallbacks)",
+                        ('field', 'index'))
+PAGES = _metric('counter', 'scraper_pages_total', "Pages de résultats analysées", ('domain',))
+PRODUCTS = _metric('counter', 'scraper_products_total', "Produits retenus", ('domain',))
+PAGES_PER_SCRAPE = _metric('histogram', 'scraper_pages_per_scrape', "Pages analysées par scraping",
+                           buckets=COUNT_BUCKETS)
+PRODUCTS_PER_SCRAPE = _metric('histogram', 'scraper_products_per_scrape', "Produits retenus par scraping",
+                              buckets=COUNT_BUCKETS)
+SCRAPES_IN_PROGRESS = _metric('gauge', 'scraper_scrapes_in_progress', "Scrapings en cours")
+REQUESTS_IN_PROGRESS = _metric('gauge', 'api_requests_in_progress', "Requêtes de l'API en cours")
+
+def record_page(domain: str, timings: Dict[str, float], selector_hits: Dict[Tuple[str, int], int],
+                products: int):
+    """Enregistre les mesures d'une page analysée (dans ce processus ou le pool d'analyse)"""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.labels(stage, domain).observe(seconds)
+    for (field, index), count in selector_hits.items():
+        SELECTOR_HITS.labels(field, str(index)).inc(count)
+    PAGES.labels(domain).inc()
+    PRODUCTS.labels(domain).inc(products)
+
+def record_scrape(pages: int, products: int):
+    """Enregistre la taille d'un scraping terminé"""
+    PAGES_PER_SCRAPE.observe(pages)
+    PRODUCTS_PER_SCRAPE.observe(products)
+
+def render_metrics() -> bytes:
+    """Métriques au format texte Prometheus"""
+    if not PROMETHEUS_AVAILABLE:
+        raise RuntimeError("prometheus_client n'est pas installé")
+    return generate_latest()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Lot de produits en colonnes (prix, rating, avis, score)
+Score gagnant et statistiques calculés d'un bloc avec NumPy s'il est installé,
+pour re-scorer de gros volumes sans accès dict par produit
+"""
+
+import csv
+import importlib.util
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Calcul vectorisé (optionnel : pip install numpy), boucle Python sinon ; importé au
+# premier lot plutôt qu'au démarrage de l'API (~70 ms)
+NUMPY_AVAILABLE = importlib.util.find_spec('numpy') is not None
+
+def winning_scores(prices, ratings, review_counts):
+    """
+    Version vectorisée de calculate_winning_score : mêmes pondérations,
+    le score des avis étant min(avis / 1000, 1)
+    """
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        prices = np.asarray(prices, dtype=np.float64)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        review_counts = np.asarray(review_counts, dtype=np.float64)
+        price_score = np.where((prices >= 10) & (prices <= 100), 0.5, 0.2)
+        rating_score = np.where(ratings > 0, ratings / 5.0, 0.0)
+        review_score = np.minimum(review_counts / 1000, 1.0)
+        return (price_score + rating_score + review_score) / 3 * 100
+
+    return [((0.5 if 10 <= price <= 100 else 0.2) + (rating / 5.0 if rating > 0 else 0.0)
+             + min(reviews / 1000, 1.0)) / 3 * 100
+            for price, rating, reviews in zip(prices, ratings, review_counts)]
+
+class ProductBatch:
+    """Colonnes numériques d'un ensemble de produits (tableaux NumPy, ou listes sans NumPy)"""
+
+    def __init__(self, prices: Sequence[float], ratings: Sequence[float],
+                 review_counts: Sequence[int], scores: Optional[Sequence[float]] = None):
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            self.prices = np.asarray(prices, dtype=np.float64)
+            self.ratings = np.asarray(ratings, dtype=np.float64)
+            self.review_counts = np.asarray(review_counts, dtype=np.int64)
+            self.scores = np.asarray(scores, dtype=np.float64) if scores is not None else None
+        else:
+            self.prices = list(prices)
+            self.ratings = list(ratings)
+            self.review_counts = list(review_counts)
+            self.scores = list(scores) if scores is not None else None
+        if not len(self.prices) == len(self.ratings) == len(self.review_counts):
+            raise ValueError("Les colonnes d'un lot doivent avoir la même longueur")
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_products(cls, products: Iterable[Dict]) -> 'ProductBatch':
+        """Construit le lot depuis des produits au format du scraper (Prix, Rating, Review_Count, Winning_Score)"""
+        products = list(products)
+        return cls([p['Prix'] for p in products],
+                   [p['Rating'] for p in products],
+                   [p['Review_Count'] for p in products],
+                   [p['Winning_Score'] for p in products])
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ProductBatch':
+        """Charge les colonnes numériques d'un export CSV du scraper"""
+        prices: List[float] = []
+        ratings: List[float] = []
+        review_counts: List[int] = []
+        scores: List[float] = []
+        with open(path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                prices.append(float(row['Prix'] or 0))
+                ratings.append(float(row['Rating'] or 0))
+                review_counts.append(int(float(row['Review_Count'] or 0)))
+                scores.append(float(row['Winning_Score'] or 0))
+        return cls(prices, ratings, review_counts, scores)
+
+    @classmethod
+    def concat(cls, batches: Iterable['ProductBatch']) -> 'ProductBatch':
+        """Assemble plusieurs lots en un seul"""
+        batches = list(batches)
+        if NUMPY_AVAILABLE and batches:
+            import numpy as np
+            return cls(np.concatenate([b.prices for b in batches]),
+                       np.concatenate([b.ratings for b in batches]),
+                       np.concatenate([b.review_counts for b in batches]),
+                       np.concatenate([b.scores if b.scores is not None else winning_scores(
+                           b.prices, b.ratings, b.review_counts) for b in batches]))
+        prices, ratings, review_counts, scores = [], [], [], []
+        for b in batches:
+            prices.extend(b.prices)
+            ratings.extend(b.ratings)
+            review_counts.extend(b.review_counts)
+            scores.extend(b.scores if b.scores is not None else b.rescore())
+        return cls(prices, ratings, review_counts, scores)
+
+    def rescore(self):
+        """Recalcule le score gagnant de tous les produits et le conserve dans le lot"""
+        self.scores = winning_scores(self.prices, self.ratings, self.review_counts)
+        return self.scores
+
+    def stats(self) -> Dict:
+        """
+        Statistiques du lot : prix et rating moyens (valeurs renseignées seulement),
+        total des avis et score moyen
+        """
+        if self.scores is None:
+            self.rescore()
+        count = len(self)
+
+        if NUMPY_AVAILABLE:
+            prices = self.prices[self.prices > 0]
+            ratings = self.ratings[self.ratings > 0]
+            return {
+                'total_products': count,
+                'avg_price': float(prices.mean()) if prices.size else 0,
+                'avg_rating': float(ratings.mean()) if ratings.size else 0,
+                'total_reviews': int(self.review_counts.sum()),
+                'avg_score': float(self.scores.mean()) if count else 0
+            }
+
+        prices = [price for price in self.prices if price > 0]
+        ratings = [rating for rating in self.ratings if rating > 0]
+        return {
+            'total_products': count,
+            'avg_price': sum(prices) / len(prices) if prices else 0,
+            'avg_rating': sum(ratings) / len(ratings) if ratings else 0,
+            'total_reviews': sum(self.review_counts),
+            'avg_score': sum(self.scores) / count if count else 0
+        }
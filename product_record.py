@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Enregistrement compact d'un produit scrapé
+Attributs en __slots__ plutôt qu'un dict par produit, devise et badge internés,
+date partagée par tous les produits d'une page ; conversion vers l'ancien format
+dict / CSV pour compatibilité
+"""
+
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Colonnes du CSV et clés du format dict historique, dans l'ordre
+CSV_FIELDNAMES = ['SKU', 'Nom', 'Prix', 'Devise', 'Lien', 'Rating', 'Review_Count', 'Badge', 'Winning_Score', 'Date_Scraping']
+
+class Product:
+    """Un produit : mêmes champs que l'ancien dict, accessibles en attributs ou par clé"""
+
+    __slots__ = ('sku', 'name', 'price', 'currency', 'link', 'rating', 'review_count',
+                 'badge', 'winning_score', 'date_scraping', 'asin')
+
+    # Clé du format dict -> attribut
+    KEYS = dict(zip(CSV_FIELDNAMES, __slots__))
+
+    def __init__(self, sku: str, name: str, price: float, currency: str, link: str, rating: float,
+                 review_count: int, badge: str, winning_score: float, date_scraping: str,
+                 asin: Optional[str] = None):
+        self.sku = sku
+        self.name = name
+        self.price = price
+        self.currency = sys.intern(currency)
+        self.link = link
+        self.rating = rating
+        self.review_count = review_count
+        self.badge = sys.intern(badge)
+        self.winning_score = winning_score
+        self.date_scraping = date_scraping
+        self.asin = asin  # Hors colonnes CSV : identifiant Amazon, clé du stockage
+
+    @classmethod
+    def from_dict(cls, product: Dict[str, Any]) -> 'Product':
+        """Construit un enregistrement depuis le format dict (clés SKU, Nom, Prix...)"""
+        return cls(*(product[key] for key in CSV_FIELDNAMES), asin=product.get('ASIN'))
+
+    def to_row(self) -> Tuple:
+        """Valeurs dans l'ordre des colonnes CSV"""
+        return (self.sku, self.name, self.price, self.currency, self.link, self.rating,
+                self.review_count, self.badge, self.winning_score, self.date_scraping)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Format dict historique (réponses JSON, code existant)"""
+        return dict(zip(CSV_FIELDNAMES, self.to_row()))
+
+    # Accès en lecture par clé, comme l'ancien dict : product['Prix']
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self.KEYS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self.KEYS else default
+
+    def keys(self) -> Iterator[str]:
+        return iter(CSV_FIELDNAMES)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Product):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    def __repr__(self) -> str:
+        return f"Product(sku={self.sku!r}, name={self.name!r}, price={self.price!r}, score={self.winning_score!r})"
+
+    def __reduce__(self):
+        # Sérialisation compacte (pool de processus) : les valeurs, dans l'ordre du constructeur
+        return (Product, self.to_row() + (self.asin,))
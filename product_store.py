@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Stockage persistant des produits scrapés (SQLite)
+Un enregistrement par (ASIN, marché) mis à jour à chaque passage, les recherches
+qui l'ont trouvé, l'empreinte de chaque page de résultats (rafraîchissement
+incrémental) et des index pour interroger sans relire les CSV
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from product_record import Product
+from response_cache import normalize_query
+
+# Fichier SQLite (SCRAPER_DB_PATH vide : stockage désactivé)
+DB_PATH = os.environ.get('SCRAPER_DB_PATH', 'products.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    asin TEXT NOT NULL,
+    market TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    link TEXT,
+    rating REAL NOT NULL,
+    review_count INTEGER NOT NULL,
+    badge TEXT NOT NULL,
+    winning_score REAL NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (asin, market)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_products_score ON products (market, winning_score);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (market, price);
+CREATE INDEX IF NOT EXISTS idx_products_last_seen ON products (last_seen);
+
+CREATE TABLE IF NOT EXISTS search_results (
+    query TEXT NOT NULL,
+    market TEXT NOT NULL,
+    asin TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (query, market, asin)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_search_results_last_seen ON search_results (query, last_seen);
+
+CREATE TABLE IF NOT EXISTS page_snapshots (
+    query TEXT NOT NULL,
+    market TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    asins TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (query, market, page)
+) WITHOUT ROWID;
+"""
+
+UPSERT_PRODUCT = """
+INSERT INTO products (asin, market, sku, name, price, currency, link, rating, review_count,
+                      badge, winning_score, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (asin, market) DO UPDATE SET
+    sku = excluded.sku, name = excluded.name, price = excluded.price, currency = excluded.currency,
+    link = excluded.link, rating = excluded.rating, review_count = excluded.review_count,
+    badge = excluded.badge, winning_score = excluded.winning_score, last_seen = excluded.last_seen
+"""
+
+UPSERT_SEARCH_RESULT = """
+INSERT INTO search_results (query, market, asin, last_seen) VALUES (?, ?, ?, ?)
+ON CONFLICT (query, market, asin) DO UPDATE SET last_seen = excluded.last_seen
+"""
+
+UPSERT_PAGE_SNAPSHOT = """
+INSERT INTO page_snapshots (query, market, page, content_hash, etag, last_modified, asins, fetched_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (query, market, page) DO UPDATE SET
+    content_hash = excluded.content_hash, etag = excluded.etag, last_modified = excluded.last_modified,
+    asins = excluded.asins, fetched_at = excluded.fetched_at
+"""
+
+# Paramètres par requête IN (...), sous la limite historique de SQLite (999)
+IN_CHUNK = 900
+
+# Tris autorisés pour les requêtes (colonne indexée)
+ORDERS = {
+    'score': 'p.winning_score DESC',
+    'price': 'p.price ASC',
+    'recent': 'p.last_seen DESC'
+}
+
+class ProductStore:
+    """Base SQLite des produits, une connexion par thread (mode WAL)"""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.upserts = 0
+        self._connect()  # Crée le schéma dès l'ouverture
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def upsert_page(self, products: Iterable[Product], market: str, search_query: Optional[str] = None) -> int:
+        """
+        Enregistre les produits d'une page en une transaction (produits sans ASIN ignorés)
+
+        Returns:
+            Nombre de produits enregistrés
+        """
+        rows = [(p.asin, market, p.sku, p.name, p.price, p.currency, p.link, p.rating, p.review_count,
+                 p.badge, p.winning_score, p.date_scraping, p.date_scraping)
+                for p in products if p.asin]
+        if not rows:
+            return 0
+
+        connection = self._connect()
+        with connection:
+            connection.executemany(UPSERT_PRODUCT, rows)
+            if search_query:
+                query = normalize_query(search_query)
+                connection.executemany(UPSERT_SEARCH_RESULT,
+                                       [(query, market, row[0], row[-1]) for row in rows])
+        with self._lock:
+            self.upserts += len(rows)
+        return len(rows)
+
+    def touch(self, asins: List[str], market: str, search_query: Optional[str], seen_at: str):
+        """Met à jour la date de dernier passage de produits revus sans changement"""
+        if not asins:
+            return
+        connection = self._connect()
+        with connection:
+            for start in range(0, len(asins), IN_CHUNK):
+                chunk = asins[start:start + IN_CHUNK]
+                marks = ','.join('?' * len(chunk))
+                connection.execute(f'UPDATE products SET last_seen = ? WHERE market = ? AND asin IN ({marks})',
+                                   (seen_at, market, *chunk))
+            if search_query:
+                query = normalize_query(search_query)
+                connection.executemany(UPSERT_SEARCH_RESULT, [(query, market, asin, seen_at) for asin in asins])
+
+    def get_products(self, asins: Iterable[str], market: str) -> Dict[str, Dict]:
+        """Derniers enregistrements connus des ASIN donnés sur un marché, par ASIN"""
+        asins = list(asins)
+        connection = self._connect()
+        products = {}
+        for start in range(0, len(asins), IN_CHUNK):
+            chunk = asins[start:start + IN_CHUNK]
+            marks = ','.join('?' * len(chunk))
+            rows = connection.execute(f'SELECT * FROM products WHERE market = ? AND asin IN ({marks})',
+                                      (market, *chunk))
+            products.update((row['asin'], dict(row)) for row in rows)
+        return products
+
+    def search_asins(self, search_query: str, market: str) -> Set[str]:
+        """ASIN déjà enregistrés pour une recherche sur un marché (scrapings et rafraîchissements)"""
+        rows = self._connect().execute(
+            'SELECT asin FROM search_results WHERE query = ? AND market = ?',
+            (normalize_query(search_query), market)
+        )
+        return {row['asin'] for row in rows}
+
+    def page_snapshots(self, search_query: str, market: str) -> Dict[int, Dict]:
+        """Empreintes des pages de la dernière passe d'une recherche, par numéro de page"""
+        rows = self._connect().execute(
+            'SELECT * FROM page_snapshots WHERE query = ? AND market = ?',
+            (normalize_query(search_query), market)
+        )
+        snapshots = {}
+        for row in rows:
+            snapshot = dict(row)
+            snapshot['asins'] = snapshot['asins'].split(',') if snapshot['asins'] else []
+            snapshots[snapshot['page']] = snapshot
+        return snapshots
+
+    def save_page_snapshot(self, search_query: str, market: str, page: int, content_hash: str,
+                           asins: List[str], etag: Optional[str] = None,
+                           last_modified: Optional[str] = None, fetched_at: Optional[str] = None):
+        """Enregistre l'empreinte d'une page et les ASIN qu'elle contenait"""
+        fetched_at = fetched_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        connection = self._connect()
+        with connection:
+            connection.execute(UPSERT_PAGE_SNAPSHOT,
+                               (normalize_query(search_query), market, page, content_hash, etag,
+                                last_modified, ','.join(asins), fetched_at))
+
+    def top_products(self, search_query: Optional[str] = None, market: Optional[str] = None,
+                     days: Optional[float] = None, limit: int = 20, order: str = 'score') -> List[Dict]:
+        """
+        Meilleurs produits, éventuellement pour une recherche, un marché et une période
+
+        Exemple : top_products('casque bluetooth', 'fr', days=7) pour le top de la semaine
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Tri inconnu: {order}")
+
+        clauses, params = [], []
+        if search_query:
+            source = 'search_results s JOIN products p ON p.asin = s.asin AND p.market = s.market'
+            clauses.append('s.query = ?')
+            params.append(normalize_query(search_query))
+            seen_column = 's.last_seen'
+        else:
+            source = 'products p'
+            seen_column = 'p.last_seen'
+        if market:
+            clauses.append('p.market = ?')
+            params.append(market.lower())
+        if days is not None:
+            clauses.append(f'{seen_column} >= ?')
+            params.append((datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S'))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = f"SELECT p.* FROM {source} {where} ORDER BY {ORDERS[order]} LIMIT ?"
+        rows = self._connect().execute(sql, (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        """Statistiques de la base"""
+        connection = self._connect()
+        return {
+            'path': self.path,
+            'products': connection.execute('SELECT COUNT(*) FROM products').fetchone()[0],
+            'searches': connection.execute('SELECT COUNT(DISTINCT query) FROM search_results').fetchone()[0],
+            'page_snapshots': connection.execute('SELECT COUNT(*) FROM page_snapshots').fetchone()[0],
+            'upserts': self.upserts
+        }
+
+_default_store: Optional[ProductStore] = None
+_default_store_lock = threading.Lock()
+
+def get_product_store() -> Optional[ProductStore]:
+    """Retourne la base partagée du processus, None si le stockage est désactivé"""
+    global _default_store
+    if not DB_PATH:
+        return None
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ProductStore()
+    return _default_store
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Profilage à la demande d'un scraping
+Un échantillonneur en pur Python (sys._current_frames) relève la pile du thread
+du scraping à intervalle fixe ; le rapport (fonctions les plus coûteuses, piles
+repliées pour flamegraph.pl / speedscope, spans du pipeline) est enregistré dans
+un répertoire borné pour être téléchargé. Pendant le profilage, les pages sont
+analysées dans le thread du scraping plutôt que dans le pool de processus, pour
+que l'échantillonneur voie l'analyse.
+"""
+
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tracing import SpanRecorder, record_spans
+
+# Configuration par variables d'environnement
+PROFILING_ENABLED = os.environ.get('SCRAPER_PROFILING', '1') != '0'
+PROFILE_DIR = os.environ.get('SCRAPER_PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL = float(os.environ.get('SCRAPER_PROFILE_INTERVAL', '0.005'))
+PROFILE_KEEP = int(os.environ.get('SCRAPER_PROFILE_KEEP', '50'))
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+# Vrai dans le contexte d'un scraping profilé (propagé aux threads de asyncio.to_thread)
+_profiling: contextvars.ContextVar[bool] = contextvars.ContextVar('scraper_profiling', default=False)
+
+def is_profiling() -> bool:
+    """Vrai si le code courant s'exécute dans un scraping profilé"""
+    return _profiling.get()
+
+class SamplingProfiler:
+    """Relève la pile d'un thread toutes les `interval` secondes, depuis un thread dédié"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()  # pile (racine d'abord) -> échantillons
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def label(self, code) -> str:
+        """Nom affiché d'une fonction : nom (fichier:ligne), mémorisé par objet code"""
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = \
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(self.label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self.run, name='scraper-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def top_functions(self, limit: int = 40) -> List[Dict]:
+        """Fonctions triées par échantillons propres (sommet de pile), avec leurs échantillons cumulés"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                total[function] += count
+        ranked = sorted(total, key=lambda function: (own[function], total[function]), reverse=True)
+        samples = self.samples or 1
+        return [{'function': function,
+                 'self_samples': own[function], 'self_ratio': round(own[function] / samples, 4),
+                 'total_samples': total[function], 'total_ratio': round(total[function] / samples, 4)}
+                for function in ranked[:limit]]
+
+    def folded(self) -> List[str]:
+        """Piles repliées 'racine;...;feuille échantillons' (flamegraph.pl, speedscope)"""
+        return [f"{';'.join(stack)} {count}" for stack, count in self.stacks.most_common()]
+
+class ProfileStore:
+    """Rapports de profilage d'un répertoire, les plus anciens supprimés au-delà de `keep`"""
+
+    def __init__(self, directory: str = PROFILE_DIR, keep: int = PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def path_for(self, profile_id: str) -> Optional[str]:
+        """Chemin du rapport, None si l'identifiant est invalide"""
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def save(self, report: Dict) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(report['id'])
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, default=str)
+        os.replace(temporary, path)
+        self.evict()
+        return path
+
+    def load(self, profile_id: str) -> Optional[Dict]:
+        path = self.path_for(profile_id)
+        if path is None or not os.path.isfile(path):
+            return None
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return sorted((entry for entry in entries
+                               if entry.is_file() and entry.name.endswith('.json')
+                               and PROFILE_ID_PATTERN.match(entry.name[:-len('.json')])),
+                              key=lambda entry: entry.stat().st_mtime, reverse=True)
+        except FileNotFoundError:
+            return []
+
+    def evict(self):
+        with self._lock:
+            for entry in self._entries()[self.keep:]:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[Dict]:
+        """Rapports disponibles, du plus récent au plus ancien"""
+        return [{'id': entry.name[:-len('.json')],
+                 'created_at': datetime.fromtimestamp(entry.stat().st_mtime).isoformat(),
+                 'size_bytes': entry.stat().st_size}
+                for entry in self._entries()]
+
+_default_store: Optional[ProfileStore] = None
+_default_store_lock = threading.Lock()
+
+def get_profile_store() -> ProfileStore:
+    """Retourne le répertoire des rapports de profilage partagé du processus"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ProfileStore()
+    return _default_store
+
+def profile_call(function: Callable, *args, description: Optional[Dict] = None,
+                 **kwargs) -> Tuple[Any, Dict]:
+    """
+    Exécute function(*args, **kwargs) sous l'échantillonneur, avec enregistrement des spans
+
+    Le rapport est enregistré même si la fonction lève une exception (qui est propagée).
+
+    Returns:
+        (résultat de la fonction, résumé du rapport : id, durée, échantillons)
+    """
+    recorder = SpanRecorder()
+    profiler = SamplingProfiler()
+    report = {
+        'id': uuid.uuid4().hex,
+        'created_at': datetime.now().isoformat(),
+        'description': description or {},
+        'interval_seconds': profiler.interval
+    }
+    token = _profiling.set(True)
+    started = time.perf_counter()
+    try:
+        with record_spans(recorder), profiler:
+            result = function(*args, **kwargs)
+    except Exception as e:
+        report['error'] = str(e)
+        raise
+    finally:
+        _profiling.reset(token)
+        report.update({
+            'duration_seconds': round(time.perf_counter() - started, 4),
+            'samples': profiler.samples,
+            'top_functions': profiler.top_functions(),
+            'spans': recorder.to_list(),
+            'folded': profiler.folded()
+        })
+        get_profile_store().save(report)
+
+    summary = {'id': report['id'], 'duration_seconds': report['duration_seconds'],
+               'samples': report['samples'], 'spans': len(report['spans'])}
+    return result, summary
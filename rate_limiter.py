@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Limiteur de débit adaptatif par domaine Amazon
+Seau à jetons partagé par tous les scrapings du processus : le débit augmente
+lentement tant que le site répond bien, et chute dès les réponses 429/503
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+# Débits en requêtes par seconde et par domaine
+RATE_INITIAL = float(os.environ.get('SCRAPER_RATE', '1.0'))
+RATE_MIN = float(os.environ.get('SCRAPER_RATE_MIN', '0.1'))
+RATE_MAX = float(os.environ.get('SCRAPER_RATE_MAX', '4.0'))
+RATE_BURST = float(os.environ.get('SCRAPER_RATE_BURST', '2'))
+
+# Nombre de nouvelles tentatives après une erreur réseau ou une réponse 429/5xx
+MAX_RETRIES = int(os.environ.get('SCRAPER_MAX_RETRIES', '3'))
+
+# Réponses indiquant une limitation (le débit est divisé) ou une erreur temporaire
+THROTTLE_STATUSES = (429, 503)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def retry_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Attente avant la tentative suivante : backoff exponentiel à gigue complète"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Lit un en-tête Retry-After exprimé en secondes"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+class AdaptiveTokenBucket:
+    """
+    Seau à jetons dont le débit s'adapte aux réponses (AIMD)
+
+    Chaque succès rapide ajoute `increase` au débit ; une réponse 429/503 ou une
+    erreur réseau le multiplie par `decrease`, une latence au-dessus de la cible
+    le réduit légèrement.
+    """
+
+    def __init__(self, rate: float = RATE_INITIAL, min_rate: float = RATE_MIN, max_rate: float = RATE_MAX,
+                 burst: float = RATE_BURST, increase: float = 0.1, decrease: float = 0.5,
+                 latency_target: float = 3.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.tokens = burst
+        self.latency = None  # Moyenne mobile exponentielle
+        self.paused_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Réserve un jeton et attend qu'il soit disponible, retourne l'attente en secondes"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(-self.tokens / self.rate, self.paused_until - now, 0.0)
+            self.requests += 1
+            self.total_wait += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record(self, status_code: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """Ajuste le débit selon le résultat d'une requête (status_code=None : erreur réseau)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+            if status_code is None or status_code in THROTTLE_STATUSES:
+                if status_code is None:
+                    self.errors += 1
+                else:
+                    self.throttled += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self.tokens = min(self.tokens, 0.0)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+            elif self.latency > self.latency_target:
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            elif status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'latency': round(self.latency, 3) if self.latency is not None else None,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'total_wait': round(self.total_wait, 3)
+            }
+
+_limiters: Dict[str, AdaptiveTokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(domain: str) -> AdaptiveTokenBucket:
+    """Retourne le limiteur partagé d'un domaine (créé au premier appel)"""
+    limiter = _limiters.get(domain)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.setdefault(domain, AdaptiveTokenBucket())
+    return limiter
+
+def rate_limiter_stats() -> Dict[str, Dict]:
+    """État de tous les limiteurs, par domaine"""
+    return {domain: limiter.stats() for domain, limiter in list(_limiters.items())}
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Cache disque des pages de résultats Amazon
+Clé (domaine, requête normalisée, page), TTL configurable, fichiers compressés,
+taille plafonnée avec éviction LRU
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+
+# Configuration par variables d'environnement (SCRAPER_CACHE_TTL=0 désactive le cache)
+CACHE_DIR = os.environ.get('SCRAPER_CACHE_DIR', '.scraper_cache')
+CACHE_TTL = int(os.environ.get('SCRAPER_CACHE_TTL', '900'))
+CACHE_MAX_MB = int(os.environ.get('SCRAPER_CACHE_MAX_MB', '200'))
+
+CACHE_SUFFIX = '.html.gz'
+
+def normalize_query(search_query: str) -> str:
+    """Normalise une recherche : Unicode NFKC, casse et espaces"""
+    return ' '.join(unicodedata.normalize('NFKC', search_query).casefold().split())
+
+class ResponseCache:
+    """Cache disque des pages HTML, une entrée compressée par fichier"""
+
+    def __init__(self, directory: str = CACHE_DIR, ttl: int = CACHE_TTL,
+                 max_bytes: int = CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._size = None  # Calculée au premier accès
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(domain: str, search_query: str, page: int) -> str:
+        """Clé d'une page : domaine, requête normalisée et numéro de page"""
+        raw = f"{domain}\n{normalize_query(search_query)}\n{page}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [entry for entry in entries if entry.name.endswith(CACHE_SUFFIX)]
+        except FileNotFoundError:
+            return []
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._entries())
+        return self._size
+
+    def get(self, domain: str, search_query: str, page: int) -> Optional[str]:
+        """Retourne la page en cache si elle existe et n'a pas expiré"""
+        if not self.enabled:
+            return None
+
+        path = self._path(self.make_key(domain, search_query, page))
+        try:
+            stat = os.stat(path)
+            now = time.time()
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path, stat.st_size)
+                with self._lock:
+                    self.expired += 1
+                    self.misses += 1
+                return None
+
+            with open(path, 'rb') as file:
+                body = gzip.decompress(file.read()).decode('utf-8')
+            # La date d'accès sert à l'ordre LRU, la date de modification au TTL
+            os.utime(path, (now, stat.st_mtime))
+        except (OSError, EOFError, UnicodeDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return body
+
+    def put(self, domain: str, search_query: str, page: int, body: str):
+        """Enregistre une page (écriture atomique) puis applique le plafond de taille"""
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self.make_key(domain, search_query, page))
+        data = gzip.compress(body.encode('utf-8'), compresslevel=6)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+
+        with self._lock:
+            size = self._current_size()
+            try:
+                size -= os.stat(path).st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._size = size + len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: str, size: int):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à 90 % du plafond"""
+        target = self.max_bytes * 0.9
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_atime)
+        for entry in entries:
+            if self._size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Vide le cache"""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+            self._size = 0
+
+    def stats(self) -> Dict:
+        """Statistiques du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'directory': self.directory,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0,
+                'entries': len(self._entries()),
+                'size_bytes': self._current_size(),
+                'max_bytes': self.max_bytes
+            }
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Retourne le cache partagé du processus"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = ResponseCache()
+    return _default_cache
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Cache des résultats de scraping pour l'API
+Clé (requête normalisée, nombre de produits, marché), TTL, et regroupement
+des requêtes identiques en cours sur un seul scraping (single-flight)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from market_resolver import resolve_market
+from response_cache import normalize_query
+
+RESULT_TTL = int(os.environ.get('SCRAPER_RESULT_TTL', '300'))
+RESULT_MAX_ENTRIES = int(os.environ.get('SCRAPER_RESULT_MAX_ENTRIES', '1024'))
+
+def make_result_key(search_query: str, num_products: int, market: Optional[str] = None,
+                    export_format: Optional[str] = None) -> Tuple:
+    """
+    Clé d'un résultat : requête normalisée (NFKC, casse, espaces), taille, marché
+    résolu (une recherche détectée et la même recherche au marché imposé partagent l'entrée)
+    et format du fichier d'export
+    """
+    return (normalize_query(search_query), num_products, resolve_market(search_query, market),
+            (export_format or 'csv').lower())
+
+class ResultCache:
+    """Cache mémoire à durée de vie limitée, avec regroupement des calculs en cours"""
+
+    def __init__(self, ttl: int = RESULT_TTL, max_entries: int = RESULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Retourne le résultat en cache s'il n'a pas expiré"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: Hashable, result: Dict):
+        """Enregistre un résultat (seuls les scrapings réussis sont conservés)"""
+        if self.ttl <= 0 or not result.get('success'):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_create(self, key: Hashable, factory: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Retourne le résultat en cache, ou attend le scraping identique déjà en cours,
+        ou lance `factory()` une seule fois pour tous les appelants simultanés
+        """
+        result = self.get(key)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+
+        future = self._inflight.get(key)
+        if future is not None:
+            with self._lock:
+                self.coalesced += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._complete(key, done))
+
+        # shield : l'annulation d'un appelant n'interrompt pas le scraping partagé
+        return await asyncio.shield(future)
+
+    def _complete(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            self.put(key, future.result())
+
+    def clear(self):
+        """Vide le cache (les scrapings en cours ne sont pas affectés)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Statistiques du cache"""
+        with self._lock:
+            return {
+                'ttl': self.ttl,
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
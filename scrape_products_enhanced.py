@@ -4,16 +4,34 @@ Script de scraping Amazon amélioré
 Version optimisée avec gestion multi-langues, devises et préparation FastAPI
 """
 
-import requests
-from bs4 import BeautifulSoup
-import csv
+import asyncio
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from operator import attrgetter
+import multiprocessing
 from urllib.parse import quote, urljoin
 import uuid
 import time
 import re
 from datetime import datetime
-from langdetect import detect, LangDetectException
-from typing import List, Dict, Optional, Tuple
+from typing import AbstractSet, Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
+
+from market_resolver import detect_market, resolve_market, warm_up_market_resolver
+from http_client import HTTP_ERRORS, domain_of, get_http_pool
+from rate_limiter import MAX_RETRIES, RETRY_STATUSES, get_rate_limiter, parse_retry_after, retry_delay
+from response_cache import get_response_cache
+from product_batch import ProductBatch
+from product_record import Product
+from exporters import Exporter, create_exporter
+from export_store import get_export_store
+from product_store import get_product_store
+from profiling import is_profiling
+from tracing import add_stage_spans, span
+from metrics import FETCH_SECONDS, SCRAPES_IN_PROGRESS, STAGE_SECONDS, record_page, record_scrape
+from html_extractor import LXML_AVAILABLE, CompiledExtractor, SelectorPlanCache, iter_search_results
 
 def calculate_winning_score(price: float, rating: float, review_score: float) -> float:
     """Calcule le score gagnant basé sur le prix, rating et nombre d'avis"""
@@ -71,65 +89,111 @@ def extract_price_and_currency(price_text: str, lang_code: str) -> Tuple[float,
     
     return 0.0, currency
 
+# Domaines Amazon par marché
+AMAZON_DOMAINS = {
+    'fr': "https://www.amazon.fr",
+    'ar': "https://www.amazon.sa", 
+    'en': "https://www.amazon.com",
+    'de': "https://www.amazon.de",
+    'it': "https://www.amazon.it",
+    'es': "https://www.amazon.es",
+    'uk': "https://www.amazon.co.uk",
+    'ca': "https://www.amazon.ca",
+    'jp': "https://www.amazon.co.jp",
+    'in': "https://www.amazon.in"
+}
+
+SUPPORTED_MARKETS = tuple(AMAZON_DOMAINS)
+
+def parse_domain_overrides(value: str) -> Dict[str, str]:
+    """Lit 'fr=http://127.0.0.1:8901,en=...' en {marché: domaine}, marchés inconnus ignorés"""
+    overrides = {}
+    for entry in value.split(','):
+        market, separator, domain = entry.partition('=')
+        market = market.strip().lower()
+        if separator and market in AMAZON_DOMAINS and domain.strip():
+            overrides[market] = domain.strip().rstrip('/')
+    return overrides
+
+# Domaines remplacés par marché (SCRAPER_AMAZON_DOMAINS) : serveur Amazon local de test, miroir
+AMAZON_DOMAINS.update(parse_domain_overrides(os.environ.get('SCRAPER_AMAZON_DOMAINS', '')))
+
 def get_amazon_domain(lang_code: str) -> str:
     """Retourne le domaine Amazon approprié selon la langue"""
-    domains = {
-        'fr': "https://www.amazon.fr",
-        'ar': "https://www.amazon.sa", 
-        'en': "https://www.amazon.com",
-        'de': "https://www.amazon.de",
-        'it': "https://www.amazon.it",
-        'es': "https://www.amazon.es",
-        'uk': "https://www.amazon.co.uk",
-        'ca': "https://www.amazon.ca",
-        'jp': "https://www.amazon.co.jp",
-        'in': "https://www.amazon.in"
-    }
-    return domains.get(lang_code, "https://www.amazon.com")
+    return AMAZON_DOMAINS.get(lang_code, AMAZON_DOMAINS['en'])
+
+# Sélecteurs CSS robustes avec fallbacks (construits une seule fois)
+ROBUST_SELECTORS = {
+    'name': [
+        'h2 a span',
+        '.a-size-medium.a-text-normal',
+        '.a-size-base-plus.a-text-normal',
+        '.a-size-mini.a-spacing-none.a-color-base.s-line-clamp-2 a span',
+        '[data-cy="title-recipe"] span',
+        '.a-size-base-plus.a-color-base.a-text-normal'
+    ],
+    'price': [
+        '.a-price .a-offscreen',
+        '.a-price-whole',
+        '.a-price .a-price-range .a-offscreen',
+        '.a-price-range .a-price-range-min .a-offscreen',
+        '.a-price .a-price-range-min .a-offscreen'
+    ],
+    'rating': [
+        '.a-icon-alt',
+        '.a-icon-star-small .a-icon-alt',
+        '[data-cy="rating-recipe"] .a-icon-alt',
+        '.a-icon-star .a-icon-alt'
+    ],
+    'link': [
+        'h2 a',
+        '.a-size-mini a',
+        '[data-cy="title-recipe"] a',
+        '.a-size-base-plus a'
+    ],
+    'reviews': [
+        '.a-size-small .a-link-normal span',
+        '.a-size-base .a-link-normal span',
+        '[data-cy="rating-recipe"] .a-size-small span',
+        '.a-size-base .a-color-secondary'
+    ],
+    'badge': [
+        '.s-label-popover-default',
+        '.a-badge-text',
+        '.a-size-mini .a-badge-text',
+        '.a-badge-supplementary-text'
+    ]
+}
+
+# Analyse restreinte aux blocs s-search-result (SCRAPER_RESTRICTED_PARSE=0 pour la désactiver)
+RESTRICTED_PARSE = os.environ.get('SCRAPER_RESTRICTED_PARSE', '1') != '0'
+
+# Chaîne de sélecteurs des blocs de résultats, du layout le plus précis au plus générique
+# (le premier correspond aux blocs isolés par l'analyse restreinte)
+ITEM_SELECTORS = [
+    '.s-result-item[data-component-type="s-search-result"]',
+    '.s-result-item',
+    '[data-asin]',
+    '.sg-col-inner'
+]
 
 def get_robust_selectors() -> Dict[str, List[str]]:
     """Retourne des sélecteurs CSS robustes avec fallbacks"""
-    return {
-        'name': [
-            'h2 a span',
-            '.a-size-medium.a-text-normal',
-            '.a-size-base-plus.a-text-normal',
-            '.a-size-mini.a-spacing-none.a-color-base.s-line-clamp-2 a span',
-            '[data-cy="title-recipe"] span',
-            '.a-size-base-plus.a-color-base.a-text-normal'
-        ],
-        'price': [
-            '.a-price .a-offscreen',
-            '.a-price-whole',
-            '.a-price .a-price-range .a-offscreen',
-            '.a-price-range .a-price-range-min .a-offscreen',
-            '.a-price .a-price-range-min .a-offscreen'
-        ],
-        'rating': [
-            '.a-icon-alt',
-            '.a-icon-star-small .a-icon-alt',
-            '[data-cy="rating-recipe"] .a-icon-alt',
-            '.a-icon-star .a-icon-alt'
-        ],
-        'link': [
-            'h2 a',
-            '.a-size-mini a',
-            '[data-cy="title-recipe"] a',
-            '.a-size-base-plus a'
-        ],
-        'reviews': [
-            '.a-size-small .a-link-normal span',
-            '.a-size-base .a-link-normal span',
-            '[data-cy="rating-recipe"] .a-size-small span',
-            '.a-size-base .a-color-secondary'
-        ],
-        'badge': [
-            '.s-label-popover-default',
-            '.a-badge-text',
-            '.a-size-mini .a-badge-text',
-            '.a-badge-supplementary-text'
-        ]
-    }
+    return ROBUST_SELECTORS
+
+@lru_cache(maxsize=1)
+def get_compiled_extractor() -> CompiledExtractor:
+    """Retourne l'extracteur lxml, compilé au premier appel"""
+    return CompiledExtractor(ROBUST_SELECTORS, ITEM_SELECTORS)
+
+@lru_cache(maxsize=1)
+def get_plan_cache() -> SelectorPlanCache:
+    """Retourne le cache des plans de sélecteurs par domaine"""
+    return SelectorPlanCache(get_compiled_extractor())
+
+def selector_plan_stats() -> Dict:
+    """Compteurs des plans de sélecteurs (vide sans lxml)"""
+    return get_plan_cache().stats() if LXML_AVAILABLE else {}
 
 def extract_element_text(item, selectors: List[str]) -> Optional[str]:
     """Extrait le texte d'un élément avec fallbacks"""
@@ -151,219 +215,568 @@ def extract_element_href(item, selectors: List[str], base_url: str) -> Optional[
                 return urljoin(base_url, href)
     return None
 
-def scrape_products(search_query: str, num_products: int = 50, delay: int = 2, 
-                   verbose: bool = True, return_stats: bool = True) -> Dict:
+# Headers HTTP avancés
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9,fr;q=0.8,ar;q=0.7',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+MAX_PAGES = 10  # Limite de sécurité
+
+# Nombre maximal de pages téléchargées en parallèle sur un même domaine Amazon
+DOMAIN_CONCURRENCY = int(os.environ.get('SCRAPER_DOMAIN_CONCURRENCY', '4'))
+
+# Pool de processus pour l'analyse HTML : SCRAPER_PARSE_WORKERS=N (0 = analyse dans le
+# processus courant). Sans la variable, seule l'API démarre un pool (un worker par cœur).
+PARSE_WORKERS = os.environ.get('SCRAPER_PARSE_WORKERS')
+
+def detect_language(search_query: str, verbose: bool = False) -> str:
+    """Détecte le marché de la recherche (écriture, puis langdetect ; anglais par défaut)"""
+    lang_code = detect_market(search_query)
+    if verbose:
+        print(f"🌍 Langue détectée : {lang_code}")
+    return lang_code
+
+def resolve_lang_code(search_query: str, market: Optional[str] = None, verbose: bool = False) -> str:
+    """Retourne le marché imposé par l'appelant, ou celui détecté depuis la recherche"""
+    if market:
+        return resolve_market(search_query, market)
+    return detect_language(search_query, verbose)
+
+def build_page_url(base_domain: str, search_query: str, page: int) -> str:
+    """Construit l'URL d'une page de résultats Amazon"""
+    return f"{base_domain}/s?k={quote(search_query)}&page={page}"
+
+def fetch_response(url: str, timeout: int = 30, max_retries: int = MAX_RETRIES,
+                   headers: Optional[Dict[str, str]] = None):
     """
-    Scrape les produits Amazon avec améliorations
-    
-    Args:
-        search_query: Terme de recherche
-        num_products: Nombre de produits à récupérer
-        delay: Délai entre les requêtes
-        verbose: Afficher les logs
-        return_stats: Retourner les statistiques
-    
+    Télécharge une page de résultats via le pool partagé, retourne la réponse
+
+    Chaque tentative passe par le limiteur adaptatif du domaine ; les erreurs réseau
+    et les réponses 429/5xx sont retentées avec un backoff à gigue. Lève une
+    HTTP_ERRORS si la page reste inaccessible. Une réponse 304 (requête
+    conditionnelle) est retournée telle quelle.
+    """
+    domain = domain_of(url)
+    limiter = get_rate_limiter(domain)
+    pool = get_http_pool(HEADERS)
+
+    for attempt in range(max_retries + 1):
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = pool.get(url, headers=headers, timeout=timeout)
+        except HTTP_ERRORS:
+            FETCH_SECONDS.labels(domain, 'error').observe(time.monotonic() - started)
+            limiter.record(None, time.monotonic() - started)
+            if attempt == max_retries:
+                raise
+            time.sleep(retry_delay(attempt))
+            continue
+
+        elapsed = time.monotonic() - started
+        FETCH_SECONDS.labels(domain, str(response.status_code)).observe(elapsed)
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        limiter.record(response.status_code, elapsed, retry_after)
+        if response.status_code in RETRY_STATUSES and attempt < max_retries:
+            time.sleep(retry_delay(attempt))
+            continue
+
+        # 304 Not Modified (requête conditionnelle) : réponse valide, que httpx
+        # traiterait comme une redirection dans raise_for_status()
+        if response.status_code == 304:
+            return response
+        response.raise_for_status()
+        return response
+
+def fetch_page(url: str, timeout: int = 30, max_retries: int = MAX_RETRIES) -> str:
+    """Télécharge une page de résultats via le pool partagé, retourne son HTML"""
+    return fetch_response(url, timeout, max_retries).text
+
+def fetch_search_page(base_domain: str, search_query: str, page: int,
+                      use_cache: bool = True, timeout: int = 30) -> Tuple[str, bool]:
+    """
+    Récupère une page de résultats via le cache disque, retourne (html, servie_par_le_cache)
+
+    Une page téléchargée n'est mise en cache qu'après analyse (cache_search_page).
+    """
+    with span('fetch', page=page, domain=base_domain) as attributes:
+        if use_cache:
+            html = get_response_cache().get(base_domain, search_query, page)
+            if html is not None:
+                attributes['cached'] = True
+                return html, True
+
+        html = fetch_page(build_page_url(base_domain, search_query, page), timeout)
+        attributes['cached'] = False
+        return html, False
+
+def fetch_search_page_conditional(base_domain: str, search_query: str, page: int,
+                                  etag: Optional[str] = None, last_modified: Optional[str] = None,
+                                  timeout: int = 30) -> Tuple[Optional[str], Dict[str, Optional[str]]]:
+    """
+    Requête conditionnelle (If-None-Match / If-Modified-Since), hors cache disque
+
     Returns:
-        Dict contenant les produits et statistiques
+        (html, validateurs ETag / Last-Modified de la réponse) ; html vaut None
+        si le serveur répond 304 Not Modified
     """
-    
-    # Détection de langue améliorée
-    try:
-        lang_code = detect(search_query)
-        if verbose:
-            print(f"🌍 Langue détectée : {lang_code}")
-    except LangDetectException:
-        if verbose:
-            print("⚠️ Langue non détectée, utilisation par défaut : anglais")
-        lang_code = 'en'
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
 
-    # Configuration selon la langue
-    base_domain = get_amazon_domain(lang_code)
-    search_url = f"{base_domain}/s?k={quote(search_query)}"
-    
-    # Headers HTTP avancés
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9,fr;q=0.8,ar;q=0.7',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Cache-Control': 'max-age=0'
+    response = fetch_response(build_page_url(base_domain, search_query, page), timeout,
+                              headers=headers or None)
+    validators = {'etag': response.headers.get('ETag') or etag,
+                  'last_modified': response.headers.get('Last-Modified') or last_modified}
+    if response.status_code == 304:
+        return None, validators
+    return response.text, validators
+
+def warm_up_markets(lang_codes: List[str]) -> Dict[str, bool]:
+    """Préchauffe les connexions vers les domaines Amazon des marchés donnés"""
+    domains = {get_amazon_domain(lang_code) for lang_code in lang_codes}
+    return get_http_pool(HEADERS).warm_up(sorted(domains))
+
+def warm_up_scraper(lang_codes: Iterable[str] = ()) -> Dict[str, float]:
+    """
+    Prépare le scraper avant la première requête : profils de langue, sélecteurs
+    compilés et, pour les marchés donnés, connexions HTTP
+
+    Returns:
+        Durée de chaque étape en secondes
+    """
+    lang_codes = list(lang_codes)
+    timings = {}
+    steps = (('language_profiles', warm_up_market_resolver),
+             ('selectors', warm_up_parser),
+             ('http_pools', lambda: warm_up_markets(lang_codes) if lang_codes else None))
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
+
+def extract_raw_fields(item, selectors: Dict[str, List[str]], base_domain: str) -> Dict[str, Optional[str]]:
+    """Extrait les champs bruts d'un bloc BeautifulSoup avec fallbacks"""
+    return {
+        'name': extract_element_text(item, selectors['name']),
+        'price': extract_element_text(item, selectors['price']),
+        'rating': extract_element_text(item, selectors['rating']),
+        'link': extract_element_href(item, selectors['link'], base_domain),
+        'reviews': extract_element_text(item, selectors['reviews']),
+        'badge': extract_element_text(item, selectors['badge'])
     }
 
-    products = []
-    page = 1
-    max_pages = 10  # Limite de sécurité
-    selectors = get_robust_selectors()
+ASIN_PATTERN = re.compile(r'/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?:[/?]|$)')
 
-    while len(products) < num_products and page <= max_pages:
-        url = f"{search_url}&page={page}"
-        if verbose:
-            print(f"📄 Scraping page {page} sur {url} ...")
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Sélecteurs CSS améliorés pour différents layouts Amazon
-            items = (
-                soup.select('.s-result-item[data-component-type="s-search-result"]') or
-                soup.select('.s-result-item') or
-                soup.select('[data-asin]') or
-                soup.select('.sg-col-inner')
-            )
-
-            if not items:
-                if verbose:
-                    print("❌ Plus de résultats trouvés, arrêt du scraping.")
-                break
+def extract_asin(link: Optional[str]) -> Optional[str]:
+    """ASIN Amazon (10 caractères) extrait du lien produit, None si absent"""
+    if not link:
+        return None
+    match = ASIN_PATTERN.search(link)
+    return match.group(1) if match else None
 
-            new_products_count = 0
-            for item in items:
-                try:
-                    # Extraction des données avec fallbacks
-                    name = extract_element_text(item, selectors['name'])
-                    price_text = extract_element_text(item, selectors['price'])
-                    rating_text = extract_element_text(item, selectors['rating'])
-                    link = extract_element_href(item, selectors['link'], base_domain)
-                    review_count_text = extract_element_text(item, selectors['reviews'])
-                    badge = extract_element_text(item, selectors['badge']) or 'Aucun'
-
-                    # Validation des données
-                    if not name or not price_text or 'buying options' in name.lower():
-                        continue
-
-                    # Extraction du prix avec devise
-                    price_float, currency = extract_price_and_currency(price_text, lang_code)
-                    
-                    # Traitement du rating
-                    rating_float = 0.0
-                    if rating_text:
-                        rating_match = re.search(r'(\d+\.?\d*)', rating_text)
-                        if rating_match:
-                            try:
-                                rating_float = float(rating_match.group(1))
-                            except ValueError:
-                                pass
-                    
-                    # Traitement du nombre d'avis
-                    review_count = 0
-                    if review_count_text:
-                        review_match = re.search(r'(\d+)', review_count_text.replace(',', ''))
-                        if review_match:
-                            review_count = int(review_match.group(1))
-                    
-                    review_score = min(review_count / 1000, 1.0)
-
-                    # Calcul du score
-                    score = calculate_winning_score(price_float, rating_float, review_score)
-                    sku = f"SKU-{str(uuid.uuid4())[:8]}"
-
-                    product = {
-                        'SKU': sku,
-                        'Nom': name,
-                        'Prix': price_float,
-                        'Devise': currency,
-                        'Lien': link,
-                        'Rating': rating_float,
-                        'Review_Count': review_count,
-                        'Badge': badge,
-                        'Winning_Score': round(score, 2),
-                        'Date_Scraping': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }
-
-                    products.append(product)
-                    new_products_count += 1
+def build_product(fields: Dict[str, Optional[str]], lang_code: str,
+                  scraped_at: Optional[str] = None, asin: Optional[str] = None) -> Optional[Product]:
+    """
+    Construit un produit à partir des champs bruts, None si le bloc n'est pas exploitable
 
-                    if len(products) >= num_products:
-                        break
-                        
-                except Exception as e:
-                    if verbose:
-                        print(f"⚠️ Erreur lors du traitement d'un produit: {e}")
+    scraped_at : date de scraping partagée par les produits d'une page (maintenant par défaut)
+    asin : ASIN du bloc (data-asin), extrait du lien produit sinon
+    """
+    name = fields['name']
+    price_text = fields['price']
+    rating_text = fields['rating']
+    review_count_text = fields['reviews']
+    badge = fields['badge'] or 'Aucun'
+
+    # Validation des données
+    if not name or not price_text or 'buying options' in name.lower():
+        return None
+
+    # Extraction du prix avec devise
+    price_float, currency = extract_price_and_currency(price_text, lang_code)
+
+    # Traitement du rating
+    rating_float = 0.0
+    if rating_text:
+        rating_match = re.search(r'(\d+\.?\d*)', rating_text)
+        if rating_match:
+            try:
+                rating_float = float(rating_match.group(1))
+            except ValueError:
+                pass
+
+    # Traitement du nombre d'avis
+    review_count = 0
+    if review_count_text:
+        review_match = re.search(r'(\d+)', review_count_text.replace(',', ''))
+        if review_match:
+            review_count = int(review_match.group(1))
+
+    review_score = min(review_count / 1000, 1.0)
+
+    # Calcul du score
+    score = calculate_winning_score(price_float, rating_float, review_score)
+    # SKU stable d'un passage à l'autre quand l'ASIN est connu
+    asin = asin or extract_asin(fields['link'])
+    sku = f"SKU-{asin}" if asin else f"SKU-{str(uuid.uuid4())[:8]}"
+
+    return Product(sku, name, price_float, currency, fields['link'], rating_float, review_count,
+                   badge, round(score, 2), scraped_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'), asin)
+
+def find_result_items(html: str, base_domain: str) -> Tuple[list, Callable, Callable]:
+    """
+    Parse la page et retourne les blocs de résultats avec les fonctions d'extraction
+    et de clôture associées (la clôture retourne les sélecteurs gagnants par champ
+    et les compteurs du plan de sélecteurs, vides avec BeautifulSoup)
+
+    Utilise le plan de sélecteurs lxml du domaine si disponible, BeautifulSoup sinon.
+    L'analyse restreinte aux blocs s-search-result est tentée en premier ; la page
+    complète n'est construite que si elle n'en contient aucun.
+    """
+    if LXML_AVAILABLE:
+        page = None
+        if RESTRICTED_PARSE:
+            page = get_plan_cache().open_results(base_domain, iter_search_results(html), 0, base_domain)
+        if page is None:
+            page = get_plan_cache().open_page(base_domain, CompiledExtractor.parse(html), base_domain)
+        if page is None:
+            return [], None, lambda: ({}, {})
+        return page.items, page.extract, page.close
+
+    # Repli sans lxml : BeautifulSoup n'est importé qu'ici (démarrage plus rapide)
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for selector in ITEM_SELECTORS:
+        items = soup.select(selector)
+        if items:
+            break
+    return items, lambda item, base_url: extract_raw_fields(item, ROBUST_SELECTORS, base_url), lambda: ({}, {})
+
+class ParsedPage(NamedTuple):
+    """
+    Produits retenus sur une page, nombre de doublons écartés (ASIN déjà vus),
+    durée de chaque étape, sélecteurs gagnants (métriques) et compteurs du plan
+    de sélecteurs (reportés dans le cache du processus principal)
+    """
+    products: List[Product]
+    duplicates: int
+    timings: Dict[str, float] = {}
+    selector_hits: Dict[Tuple[str, int], int] = {}
+    plan_stats: Dict = {}
+
+class SeenAsins:
+    """ASIN déjà retenus pendant un scraping, nombre de doublons écartés et de pages analysées"""
+
+    def __init__(self):
+        self.asins = set()
+        self.duplicates = 0
+        self.pages = 0
+
+    def accept(self, parsed: ParsedPage) -> List[Product]:
+        """
+        Retient les produits d'une page analysée : compte ses doublons, écarte ceux
+        déjà retenus entre-temps (pages d'une même vague analysées en parallèle)
+        """
+        self.pages += 1
+        self.duplicates += parsed.duplicates
+        products = []
+        for product in parsed.products:
+            if product.asin:
+                if product.asin in self.asins:
+                    self.duplicates += 1
                     continue
+                self.asins.add(product.asin)
+            products.append(product)
+        return products
 
-            if new_products_count == 0:
-                if verbose:
-                    print("⚠️ Aucun nouveau produit ajouté cette page, arrêt du scraping.")
-                break
+def result_asin(item) -> Optional[str]:
+    """ASIN d'un bloc de résultat : attribut data-asin du bloc ou de son plus proche ancêtre"""
+    asin = item.get('data-asin')
+    if asin:
+        return asin
+    # lxml : iterancestors() ; BeautifulSoup : parents
+    ancestors = item.iterancestors() if hasattr(item, 'iterancestors') else item.parents
+    for ancestor in ancestors:
+        asin = ancestor.get('data-asin')
+        if asin:
+            return asin
+    return None
+
+def parse_products_page(html: str, base_domain: str, lang_code: str,
+                        limit: Optional[int] = None, verbose: bool = False,
+                        seen_asins: AbstractSet[str] = frozenset()) -> Optional[ParsedPage]:
+    """
+    Extrait les produits d'une page de résultats (une seule date de scraping par page)
 
-            page += 1
-            time.sleep(delay)
+    Les blocs dont l'ASIN a déjà été vu (pages précédentes ou plus haut sur la page :
+    sponsorisés répétés, blocs imbriqués des sélecteurs de repli) sont écartés avant
+    toute extraction de champs.
+
+    Returns:
+        Produits uniques (au plus `limit`) et doublons écartés, ou None si la page
+        ne contient aucun résultat
+    """
+    started = time.perf_counter()
+    items, extract, close = find_result_items(html, base_domain)
+
+    if not items:
+        return None
+
+    scraped_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    products = []
+    page_asins = set()
+    duplicates = 0
+    extract_seconds = score_seconds = 0.0
+    for item in items:
+        asin = result_asin(item)
+        if asin:
+            if asin in seen_asins or asin in page_asins:
+                duplicates += 1
+                continue
+            page_asins.add(asin)
 
-        except requests.RequestException as e:
+        try:
+            extract_started = time.perf_counter()
+            fields = extract(item, base_domain)
+            score_started = time.perf_counter()
+            product = build_product(fields, lang_code, scraped_at, asin)
+            extract_seconds += score_started - extract_started
+            score_seconds += time.perf_counter() - score_started
+        except Exception as e:
             if verbose:
-                print(f"❌ Erreur requête HTTP: {e}")
+                print(f"⚠️ Erreur lors du traitement d'un produit: {e}")
+            continue
+
+        if product is None:
+            continue
+        products.append(product)
+
+        if limit is not None and len(products) >= limit:
             break
 
+    selector_hits, plan_stats = close()
+    # Le reste du temps est l'analyse HTML (progressive avec l'analyse restreinte)
+    timings = {'parse': time.perf_counter() - started - extract_seconds - score_seconds,
+               'extract': extract_seconds, 'score': score_seconds}
+    return ParsedPage(products, duplicates, timings, selector_hits, plan_stats)
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+def warm_up_parser():
+    """Compile les sélecteurs lxml (exécuté dans chaque worker au démarrage)"""
+    if LXML_AVAILABLE:
+        get_compiled_extractor()
+
+def start_parse_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """
+    Démarre le pool de processus d'analyse HTML (réutilisé par tous les scrapings)
+
+    workers=None : SCRAPER_PARSE_WORKERS, ou un worker par cœur si la variable est absente.
+    """
+    global _parse_pool
+    if workers is None:
+        workers = int(PARSE_WORKERS) if PARSE_WORKERS is not None else (os.cpu_count() or 1)
+    if workers <= 0:
+        return None
+    if _parse_pool is None:
+        # 'spawn' : pas de fork d'un processus qui exécute déjà des threads
+        _parse_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        # Démarre tous les workers dès maintenant et compile leurs sélecteurs
+        for _ in range(workers):
+            _parse_pool.submit(warm_up_parser)
+    return _parse_pool
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Retourne le pool d'analyse s'il est démarré ou configuré, None sinon"""
+    if _parse_pool is None and PARSE_WORKERS is not None and int(PARSE_WORKERS) > 0:
+        return start_parse_pool()
+    return _parse_pool
+
+def shutdown_parse_pool(wait: bool = False):
+    """Arrête le pool d'analyse (wait=True attend la fin des workers, à l'arrêt du processus)"""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=wait, cancel_futures=True)
+        _parse_pool = None
+
+def record_parsed_page(parsed: Optional[ParsedPage], base_domain: str, attributes: Dict,
+                       from_pool: bool = False) -> Optional[ParsedPage]:
+    """
+    Reporte les mesures d'une page analysée (éventuellement dans le pool) dans les
+    métriques et dans le span 'parse' en cours (attributs, spans 'extract' et 'score')
+
+    Une page analysée dans le pool reporte aussi ses compteurs de plan de sélecteurs
+    dans le cache de ce processus (selector_plan_stats).
+    """
+    if parsed is not None:
+        if from_pool and parsed.plan_stats:
+            get_plan_cache().merge(base_domain, parsed.plan_stats)
+        record_page(base_domain, parsed.timings, parsed.selector_hits, len(parsed.products))
+        attributes.update(products=len(parsed.products), duplicates=parsed.duplicates)
+        add_stage_spans({stage: parsed.timings[stage] for stage in ('extract', 'score')
+                         if stage in parsed.timings}, domain=base_domain)
+    return parsed
+
+def parse_page(html: str, base_domain: str, lang_code: str, limit: Optional[int] = None,
+               verbose: bool = False, seen_asins: AbstractSet[str] = frozenset()) -> Optional[ParsedPage]:
+    """Extrait les produits d'une page dans le pool de processus s'il existe, localement sinon"""
+    with span('parse', domain=base_domain) as attributes:
+        # Profilage : analyse dans ce thread, visible par l'échantillonneur
+        pool = None if is_profiling() else get_parse_pool()
+        parsed = None
+        if pool is not None:
+            try:
+                parsed = pool.submit(parse_products_page, html, base_domain, lang_code, limit,
+                                     False, seen_asins).result()
+            except BrokenProcessPool:
+                shutdown_parse_pool()
+                pool = None
+        if pool is None:
+            parsed = parse_products_page(html, base_domain, lang_code, limit, verbose, seen_asins)
+        return record_parsed_page(parsed, base_domain, attributes, from_pool=pool is not None)
+
+async def parse_page_async(html: str, base_domain: str, lang_code: str, limit: Optional[int] = None,
+                           verbose: bool = False,
+                           seen_asins: AbstractSet[str] = frozenset()) -> Optional[ParsedPage]:
+    """
+    Version asynchrone de parse_page : analyse dans le pool de processus s'il existe,
+    dans un thread sinon (pool désactivé, pas encore démarré ou cassé, profilage),
+    pour ne pas bloquer la boucle d'événements
+    """
+    with span('parse', domain=base_domain) as attributes:
+        pool = None if is_profiling() else get_parse_pool()
+        parsed = None
+        if pool is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                parsed = await loop.run_in_executor(pool, parse_products_page, html, base_domain, lang_code,
+                                                    limit, False, seen_asins)
+            except BrokenProcessPool:
+                shutdown_parse_pool()
+                pool = None
+        if pool is None:
+            parsed = await asyncio.to_thread(parse_products_page, html, base_domain, lang_code, limit,
+                                             verbose, seen_asins)
+        return record_parsed_page(parsed, base_domain, attributes, from_pool=pool is not None)
+
+def cache_search_page(base_domain: str, search_query: str, page: int, html: str,
+                      parsed: Optional[ParsedPage]):
+    """
+    Met en cache une page téléchargée si elle contient des produits (retenus ou
+    doublons) : un captcha ou une page vide servie en 200 n'est pas conservée
+    pendant tout le TTL
+    """
+    if parsed is None or not (parsed.products or parsed.duplicates):
+        return
+    try:
+        get_response_cache().put(base_domain, search_query, page, html)
+    except OSError:
+        pass  # Un cache indisponible ne doit pas faire échouer le scraping
+
+def save_page(exporter: Exporter, products: List[Product], search_query: str, lang_code: str):
+    """Ajoute une page au fichier d'export et l'enregistre dans la base produits (si activée)"""
+    domain = get_amazon_domain(lang_code)
+    with span('export', domain=domain, products=len(products)):
+        started = time.perf_counter()
+        exporter.write_page(products)
+        STAGE_SECONDS.labels('export', domain).observe(time.perf_counter() - started)
+    store = get_product_store()
+    if store is not None:
+        with span('store', domain=domain, products=len(products)):
+            started = time.perf_counter()
+            store.upsert_page(products, lang_code, search_query)
+            STAGE_SECONDS.labels('store', domain).observe(time.perf_counter() - started)
+
+def finalize_results(products: List[Product], search_query: str, lang_code: str,
+                     verbose: bool = True, return_stats: bool = True,
+                     exporter: Optional[Exporter] = None, duplicates: int = 0, pages: int = 0) -> Dict:
+    """
+    Trie les produits, termine le fichier d'export et calcule les statistiques
+
+    `exporter` : export déjà alimenté page par page pendant le scraping (il est
+    fermé ici) ; sans exporteur, un CSV trié par score est écrit d'un bloc.
+    Le fichier est placé dans le répertoire d'export géré (SCRAPER_EXPORT_DIR).
+
+    Les produits restent des enregistrements Product (lisibles par clé comme l'ancien
+    dict) ; stats['top_product'] est au format dict, stats['duplicates'] compte les
+    résultats écartés car leur ASIN était déjà retenu, stats['pages'] les pages analysées.
+    """
+    record_scrape(pages, len(products))
+
     # Tri par score décroissant
-    products = sorted(products, key=lambda x: x['Winning_Score'], reverse=True)
+    products = sorted(products, key=attrgetter('winning_score'), reverse=True)
 
-    # Génération du fichier CSV avec nom intelligent
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    safe_query = re.sub(r'[^\w\s-]', '', search_query).replace(' ', '_')
-    filename = f"{safe_query}_winning_products_{timestamp}.csv"
-    
+    filename = exporter.filename if exporter is not None else None
     try:
-        with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            fieldnames = ['SKU', 'Nom', 'Prix', 'Devise', 'Lien', 'Rating', 'Review_Count', 'Badge', 'Winning_Score', 'Date_Scraping']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(products)
-        
+        if exporter is None:
+            exporter = create_exporter(search_query)
+            filename = exporter.filename
+            exporter.write_page(products)
+        domain = get_amazon_domain(lang_code)
+        with span('export', domain=domain, products=len(products), close=True):
+            started = time.perf_counter()
+            exporter.close()
+            STAGE_SECONDS.labels('export', domain).observe(time.perf_counter() - started)
+        get_export_store().add(exporter.path)
+
         if verbose:
-            print(f"✅ Fichier CSV généré : {filename} avec {len(products)} produits.")
+            print(f"✅ Fichier généré : {exporter.path} avec {exporter.count} produits.")
     except Exception as e:
         if verbose:
-            print(f"❌ Erreur lors de la génération du CSV: {e}")
+            print(f"❌ Erreur lors de la génération du fichier: {e}")
 
     # Statistiques détaillées
     stats = {}
     if products and return_stats:
         top = products[0]
+        currency = top.currency
         
         if verbose:
             print(f"\n🏆 Top produit gagnant :")
-            print(f"SKU: {top['SKU']}")
-            print(f"Nom: {top['Nom']}")
-            print(f"Prix: {top['Prix']:.2f} {top['Devise']}")
-            print(f"Rating: {top['Rating']}")
-            print(f"Reviews: {top['Review_Count']}")
-            print(f"Badge: {top['Badge']}")
-            print(f"Score: {top['Winning_Score']:.2f}")
-            print(f"Lien: {top['Lien']}")
-
-        # Calcul des statistiques
-        prices = [p['Prix'] for p in products if p['Prix'] > 0]
-        ratings = [p['Rating'] for p in products if p['Rating'] > 0]
-        reviews = [p['Review_Count'] for p in products]
-        scores = [p['Winning_Score'] for p in products]
-
-        stats = {
-            'total_products': len(products),
-            'avg_price': sum(prices) / len(prices) if prices else 0,
-            'avg_rating': sum(ratings) / len(ratings) if ratings else 0,
-            'total_reviews': sum(reviews),
-            'avg_score': sum(scores) / len(scores) if scores else 0,
-            'top_product': top,
+            print(f"SKU: {top.sku}")
+            print(f"Nom: {top.name}")
+            print(f"Prix: {top.price:.2f} {top.currency}")
+            print(f"Rating: {top.rating}")
+            print(f"Reviews: {top.review_count}")
+            print(f"Badge: {top.badge}")
+            print(f"Score: {top.winning_score:.2f}")
+            print(f"Lien: {top.link}")
+
+        # Calcul des statistiques (colonnes vectorisées)
+        stats = ProductBatch.from_products(products).stats()
+        stats.update({
+            'top_product': top.to_dict(),
             'filename': filename,
             'search_query': search_query,
             'lang_code': lang_code,
             'scraping_date': datetime.now().isoformat(),
-            'currency': currency
-        }
+            'currency': currency,
+            'duplicates': duplicates,
+            'pages': pages
+        })
 
         if verbose:
             print(f"\n📊 Statistiques générales :")
             print(f"- Produits analysés : {stats['total_products']}")
+            if duplicates:
+                print(f"- Doublons écartés : {duplicates}")
             print(f"- Prix moyen : {stats['avg_price']:.2f} {currency}")
-            if ratings:
+            if stats['avg_rating']:
                 print(f"- Note moyenne : {stats['avg_rating']:.2f}")
             print(f"- Total avis cumulés : {stats['total_reviews']}")
             print(f"- Score moyen : {stats['avg_score']:.2f}")
@@ -374,10 +787,239 @@ def scrape_products(search_query: str, num_products: int = 50, delay: int = 2,
         'success': len(products) > 0
     }
 
+def iter_product_pages(search_query: str, num_products: int = 50, delay: int = 2,
+                       verbose: bool = False, use_cache: bool = True,
+                       market: Optional[str] = None,
+                       seen: Optional[SeenAsins] = None) -> Iterator[Tuple[int, List[Product]]]:
+    """
+    Générateur : produits page par page, dès que chaque page est analysée
+
+    Le rythme des requêtes est fixé par le limiteur adaptatif partagé du domaine ;
+    `delay` n'est conservé que pour compatibilité. Les ASIN déjà vus sont écartés
+    et comptés dans `seen` (fourni par l'appelant pour lire le nombre de doublons).
+
+    Yields:
+        (numéro de page, produits de la page), au plus num_products produits uniques au total
+    """
+    lang_code = resolve_lang_code(search_query, market, verbose)
+    base_domain = get_amazon_domain(lang_code)
+    if seen is None:
+        seen = SeenAsins()
+
+    total = 0
+    page = 1
+
+    while total < num_products and page <= MAX_PAGES:
+        if verbose:
+            print(f"📄 Scraping page {page} sur {build_page_url(base_domain, search_query, page)} ...")
+        
+        with span('page', page=page, domain=base_domain):
+            try:
+                html, cached = fetch_search_page(base_domain, search_query, page, use_cache)
+            except HTTP_ERRORS as e:
+                if verbose:
+                    print(f"❌ Erreur requête HTTP: {e}")
+                break
+
+            parsed = parse_page(html, base_domain, lang_code, limit=num_products - total,
+                                verbose=verbose, seen_asins=seen.asins)
+            if use_cache and not cached:
+                cache_search_page(base_domain, search_query, page, html, parsed)
+            del html  # Libère la page avant la requête suivante
+
+        if parsed is None:
+            if verbose:
+                print("❌ Plus de résultats trouvés, arrêt du scraping.")
+            break
+
+        page_products = seen.accept(parsed)
+        if parsed.duplicates and verbose:
+            print(f"♻️ {parsed.duplicates} doublon(s) écarté(s) sur la page {page}")
+        if not page_products:
+            if verbose:
+                print("⚠️ Aucun nouveau produit ajouté cette page, arrêt du scraping.")
+            break
+
+        total += len(page_products)
+        if cached and verbose:
+            print("💾 Page servie par le cache")
+        yield page, page_products
+        page += 1
+
+def scrape_products(search_query: str, num_products: int = 50, delay: int = 2, 
+                   verbose: bool = True, return_stats: bool = True, use_cache: bool = True,
+                   market: Optional[str] = None,
+                   progress_callback: Optional[Callable[[Dict], None]] = None,
+                   export_format: Optional[str] = None) -> Dict:
+    """
+    Scrape les produits Amazon avec améliorations
+    
+    Args:
+        search_query: Terme de recherche
+        num_products: Nombre de produits à récupérer
+        delay: Conservé pour compatibilité (le rythme est fixé par le limiteur adaptatif du domaine)
+        verbose: Afficher les logs
+        return_stats: Retourner les statistiques
+        use_cache: Utiliser le cache disque des pages de résultats
+        market: Marché Amazon imposé (fr, en, de...), détecté depuis la recherche sinon
+        progress_callback: Appelée après chaque page avec {'pages_done', 'products_so_far'}
+        export_format: Format du fichier (csv, csv.gz, ndjson, parquet, arrow), écrit page par page
+    
+    Returns:
+        Dict contenant les produits et statistiques
+    """
+    
+    # Détection de langue améliorée
+    lang_code = resolve_lang_code(search_query, market, verbose)
+    exporter = create_exporter(search_query, export_format)
+
+    with SCRAPES_IN_PROGRESS.track_inprogress(), \
+            span('scrape', search_query=search_query, market=lang_code, num_products=num_products):
+        products = []
+        seen = SeenAsins()
+        try:
+            for page, page_products in iter_product_pages(search_query, num_products, delay, verbose,
+                                                          use_cache, market=lang_code, seen=seen):
+                products.extend(page_products)
+                save_page(exporter, page_products, search_query, lang_code)
+                if progress_callback:
+                    progress_callback({'pages_done': page, 'products_so_far': len(products)})
+        except BaseException:
+            exporter.close()
+            raise
+
+        return finalize_results(products, search_query, lang_code, verbose, return_stats, exporter,
+                                seen.duplicates, seen.pages)
+
+# Sémaphores par domaine, un jeu par boucle asyncio (un sémaphore est lié à sa boucle)
+_domain_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+def get_domain_semaphore(base_domain: str) -> asyncio.Semaphore:
+    """Retourne le sémaphore limitant les téléchargements simultanés sur un domaine"""
+    loop = asyncio.get_running_loop()
+    semaphores = _domain_semaphores.setdefault(loop, {})
+    if base_domain not in semaphores:
+        semaphores[base_domain] = asyncio.Semaphore(DOMAIN_CONCURRENCY)
+    return semaphores[base_domain]
+
+async def fetch_search_page_async(base_domain: str, search_query: str, page: int,
+                                  use_cache: bool = True) -> Tuple[str, bool]:
+    """Récupère une page dans un thread, en respectant la limite du domaine"""
+    async with get_domain_semaphore(base_domain):
+        return await asyncio.to_thread(fetch_search_page, base_domain, search_query, page, use_cache)
+
+async def fetch_and_parse_async(base_domain: str, search_query: str, page: int, lang_code: str,
+                                limit: Optional[int], use_cache: bool = True, verbose: bool = False,
+                                seen_asins: AbstractSet[str] = frozenset()) -> Tuple[Optional[ParsedPage], bool]:
+    """Télécharge puis analyse une page, retourne (page analysée, servie_par_le_cache)"""
+    with span('page', page=page, domain=base_domain):
+        html, cached = await fetch_search_page_async(base_domain, search_query, page, use_cache)
+        parsed = await parse_page_async(html, base_domain, lang_code, limit, verbose, seen_asins)
+        if use_cache and not cached:
+            await asyncio.to_thread(cache_search_page, base_domain, search_query, page, html, parsed)
+        return parsed, cached
+
+async def scrape_products_async(search_query: str, num_products: int = 50, delay: int = 2,
+                                verbose: bool = False, return_stats: bool = True,
+                                use_cache: bool = True, market: Optional[str] = None,
+                                progress_callback: Optional[Callable[[Dict], None]] = None,
+                                export_format: Optional[str] = None) -> Dict:
+    """
+    Version asynchrone de scrape_products
+
+    La première page sert à estimer le nombre de produits par page, puis les pages
+    nécessaires sont téléchargées en parallèle par vagues (au plus DOMAIN_CONCURRENCY
+    requêtes simultanées par domaine). Chaque page est analysée dès son arrivée (dans le
+    pool de processus s'il existe), puis les pages sont assemblées dans l'ordre, avec
+    les mêmes règles d'arrêt que la version synchrone. Les ASIN retenus par les vagues
+    précédentes sont écartés à l'analyse ; ceux répétés entre pages d'une même vague
+    le sont à l'assemblage.
+
+    Returns:
+        Dict contenant les produits et statistiques (même format que scrape_products)
+    """
+    lang_code = resolve_lang_code(search_query, market, verbose)
+    base_domain = get_amazon_domain(lang_code)
+    exporter = create_exporter(search_query, export_format)
+
+    with SCRAPES_IN_PROGRESS.track_inprogress(), \
+            span('scrape', search_query=search_query, market=lang_code, num_products=num_products):
+        products = []
+        seen = SeenAsins()
+        next_page = 1
+        wave_size = 1  # La première vague ne contient que la page 1
+        finished = False
+
+        try:
+            while not finished and len(products) < num_products and next_page <= MAX_PAGES:
+                pages = list(range(next_page, min(next_page + wave_size, MAX_PAGES + 1)))
+                if verbose:
+                    print(f"📄 Scraping des pages {pages[0]} à {pages[-1]} sur {base_domain} ...")
+
+                limit = num_products - len(products)
+                results = await asyncio.gather(
+                    *(fetch_and_parse_async(base_domain, search_query, page, lang_code, limit, use_cache,
+                                            verbose, seen.asins)
+                      for page in pages),
+                    return_exceptions=True
+                )
+
+                for page, result in zip(pages, results):
+                    if isinstance(result, HTTP_ERRORS):
+                        if verbose:
+                            print(f"❌ Erreur requête HTTP (page {page}): {result}")
+                        finished = True
+                        break
+                    if isinstance(result, BaseException):
+                        raise result
+
+                    parsed, _ = result
+                    page_products = seen.accept(parsed) if parsed is not None else None
+                    if not page_products:
+                        if verbose:
+                            print(f"❌ Aucun nouveau produit sur la page {page}, arrêt du scraping.")
+                        finished = True
+                        break
+
+                    page_products = page_products[:num_products - len(products)]
+                    products.extend(page_products)
+                    # Export et base produits : écritures disque hors de la boucle d'événements
+                    await asyncio.to_thread(save_page, exporter, page_products, search_query, lang_code)
+                    if progress_callback:
+                        progress_callback({'pages_done': page, 'products_so_far': len(products)})
+                    if len(products) >= num_products:
+                        break
+
+                if finished or len(products) >= num_products:
+                    break
+
+                # Estimation du nombre de pages restantes à partir du rendement moyen par page
+                next_page = pages[-1] + 1
+                per_page = max(len(products) // pages[-1], 1)
+                wave_size = -(-(num_products - len(products)) // per_page)
+        except BaseException:
+            exporter.close()
+            raise
+
+        return await asyncio.to_thread(finalize_results, products, search_query, lang_code, verbose,
+                                       return_stats, exporter, seen.duplicates, seen.pages)
+
 # Version pour FastAPI (sans I/O)
-def scrape_products_api(search_query: str, num_products: int = 50, delay: int = 2) -> Dict:
+def scrape_products_api(search_query: str, num_products: int = 50, delay: int = 2,
+                        market: Optional[str] = None,
+                        progress_callback: Optional[Callable[[Dict], None]] = None,
+                        export_format: Optional[str] = None) -> Dict:
     """Version de la fonction pour utilisation avec FastAPI (sans print/input)"""
-    return scrape_products(search_query, num_products, delay, verbose=False, return_stats=True)
+    return scrape_products(search_query, num_products, delay, verbose=False, return_stats=True,
+                           market=market, progress_callback=progress_callback,
+                           export_format=export_format)
+
+async def scrape_products_api_async(search_query: str, num_products: int = 50, delay: int = 2,
+                                    market: Optional[str] = None,
+                                    export_format: Optional[str] = None) -> Dict:
+    """Version asynchrone pour FastAPI (sans print/input)"""
+    return await scrape_products_async(search_query, num_products, delay, verbose=False,
+                                       return_stats=True, market=market, export_format=export_format)
 
 if __name__ == "__main__":
     search_term = input("Entrez le produit à rechercher (français, arabe, anglais...) : ")
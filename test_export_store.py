@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests des en-têtes conditionnels et des plages de téléchargement
+etag_matches décide du 304, parse_range du 206 (plage), du 416 (hors du
+fichier) ou de la réponse complète (en-tête ignoré).
+"""
+
+import pytest
+
+from export_store import etag_matches, parse_range
+
+ETAG = '"abc123"'
+
+@pytest.mark.parametrize('if_none_match, expected', [
+    (None, False),
+    ('', False),
+    ('"abc123"', True),
+    ('W/"abc123"', True),
+    ('"other", "abc123"', True),
+    ('*', True),
+    ('"other"', False),
+    ('abc123', False),
+])
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, ETAG) is expected
+
+@pytest.mark.parametrize('range_header, expected', [
+    ('bytes=0-9', (0, 9)),
+    ('bytes=10-', (10, 49)),
+    ('bytes=40-100', (40, 49)),
+    ('bytes=-10', (40, 49)),
+    ('bytes=-100', (0, 49)),
+    ('bytes=49-49', (49, 49)),
+])
+def test_parse_range_partial(range_header, expected):
+    assert parse_range(range_header, 50) == expected
+
+@pytest.mark.parametrize('range_header', [
+    None,
+    '',
+    'items=0-9',
+    'bytes=0-9,20-29',
+    'bytes=abc-',
+    'bytes=-',
+    'bytes=10',
+    'bytes=9-0',
+])
+def test_parse_range_ignored(range_header):
+    assert parse_range(range_header, 50) is None
+
+@pytest.mark.parametrize('range_header, size', [
+    ('bytes=50-', 50),
+    ('bytes=100-', 50),
+    ('bytes=100-200', 50),
+    ('bytes=-0', 50),
+    ('bytes=0-', 0),
+    ('bytes=-10', 0),
+])
+def test_parse_range_unsatisfiable(range_header, size):
+    with pytest.raises(ValueError):
+        parse_range(range_header, size)
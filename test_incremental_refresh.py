@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test de non-régression du rafraîchissement incrémental
+Deux rafraîchissements d'une même recherche contre le serveur Amazon local
+(benchmarks/fake_amazon.py) : le premier signale tous les produits comme
+nouveaux, le second reçoit des 304 Not Modified et ne signale aucun changement.
+Un rafraîchissement après un scraping classique ne signale pas comme nouveaux
+les produits déjà enregistrés.
+"""
+
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+import pytest  # noqa: E402
+
+import export_store  # noqa: E402
+import product_store  # noqa: E402
+import scrape_products_enhanced as scraper  # noqa: E402
+from fake_amazon import DEFAULTS, FakeAmazon, build_configs  # noqa: E402
+from incremental_refresh import NEW, refresh_products  # noqa: E402
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def fake_amazon(tmp_path, monkeypatch):
+    """Serveur Amazon local (marché fr), base produits et exports dans tmp_path"""
+    defaults = {**DEFAULTS, 'latency_ms': 0, 'jitter_ms': 0, 'pages': 2}
+    fake = FakeAmazon(build_configs(defaults, markets=['fr']), port=free_port()).start()
+    monkeypatch.setitem(scraper.AMAZON_DOMAINS, 'fr', fake.domains()['fr'])
+    monkeypatch.setattr(product_store, '_default_store',
+                        product_store.ProductStore(str(tmp_path / 'products.db')))
+    monkeypatch.setattr(export_store, '_default_store', export_store.ExportStore(str(tmp_path / 'exports')))
+    try:
+        yield fake
+    finally:
+        fake.stop()
+
+def test_second_refresh_is_not_modified(fake_amazon):
+    """Le second rafraîchissement passe par les 304 du serveur, sans analyse ni changement"""
+    first = refresh_products('casque bluetooth', num_products=40, market='fr')
+    assert first['success'], first.get('error')
+    assert first['stats']['pages'] == 1
+    assert first['changes'] and all(change['type'] == NEW for change in first['changes'])
+
+    second = refresh_products('casque bluetooth', num_products=40, market='fr')
+    assert second['success'], second.get('error')
+    assert second['stats']['pages'] == first['stats']['pages']
+    assert second['stats']['not_modified'] == second['stats']['pages']
+    assert second['stats']['unchanged'] == len(first['changes'])
+    assert second['changes'] == []
+
+def test_refresh_after_scrape_reports_no_new_products(fake_amazon):
+    """Sans passe de rafraîchissement précédente, les produits d'un scraping classique sont connus"""
+    scraped = scraper.scrape_products('casque bluetooth', num_products=40, verbose=False,
+                                      use_cache=False, market='fr')
+    assert scraped['success'], scraped.get('error')
+
+    refreshed = refresh_products('casque bluetooth', num_products=40, market='fr')
+    assert refreshed['success'], refreshed.get('error')
+    assert refreshed['changes'] == []
+    assert refreshed['stats']['unchanged'] == len(scraped['products'])
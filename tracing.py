@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Spans de traçage du pipeline de scraping
+Un scraping produit un span racine 'scrape', un span 'page' par page (avec ses
+enfants 'fetch', 'parse', 'extract', 'score') et des spans 'export' / 'store'.
+Les spans sont exportés en OTLP/HTTP vers un collecteur si SCRAPER_OTLP_ENDPOINT
+est défini (opentelemetry-sdk requis), et enregistrés localement pendant un
+profilage (record_spans) pour figurer dans son rapport. Sans l'un ni l'autre,
+span() ne fait rien d'autre que lire la configuration et le contexte.
+"""
+
+import contextvars
+import importlib.util
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Configuration par variables d'environnement
+OTLP_ENDPOINT = os.environ.get('SCRAPER_OTLP_ENDPOINT', '')  # ex. http://localhost:4318/v1/traces
+SERVICE_NAME = os.environ.get('SCRAPER_SERVICE_NAME', 'product-data-fetcher')
+
+# Export OTLP (optionnel : pip install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http),
+# importé par get_tracer() seulement si SCRAPER_OTLP_ENDPOINT est défini (~50 ms au démarrage)
+OTEL_AVAILABLE = (importlib.util.find_spec('opentelemetry') is not None
+                  and importlib.util.find_spec('opentelemetry.sdk') is not None)
+_otel_failed = False  # Exportateur OTLP absent : export désactivé
+
+class SpanRecorder:
+    """Spans enregistrés localement (rapport de profilage), horodatés depuis le début de l'enregistrement"""
+
+    def __init__(self):
+        self.origin = time.time_ns()
+        self.spans: List[Dict] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_id(self) -> int:
+        return next(self._ids)
+
+    def add(self, span_id: int, parent: Optional[int], name: str, start_ns: int, end_ns: int,
+            attributes: Dict):
+        with self._lock:
+            self.spans.append({
+                'id': span_id,
+                'parent': parent,
+                'name': name,
+                'start_ms': round((start_ns - self.origin) / 1e6, 3),
+                'duration_ms': round((end_ns - start_ns) / 1e6, 3),
+                'attributes': attributes
+            })
+
+    def to_list(self) -> List[Dict]:
+        """Spans triés par début"""
+        with self._lock:
+            return sorted(self.spans, key=lambda span: (span['start_ms'], span['id']))
+
+# Enregistreur local actif et span parent courant (propagés aux tâches asyncio et à asyncio.to_thread)
+_current: contextvars.ContextVar[Optional[Tuple[SpanRecorder, Optional[int]]]] = \
+    contextvars.ContextVar('scraper_span', default=None)
+
+_provider = None
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer():
+    """Traceur OpenTelemetry exportant vers SCRAPER_OTLP_ENDPOINT, None si l'export est désactivé"""
+    global _provider, _tracer, _otel_failed
+    if not OTLP_ENDPOINT or not OTEL_AVAILABLE or _otel_failed:
+        return None
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None and not _otel_failed:
+                try:
+                    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+                    from opentelemetry.sdk.resources import Resource
+                    from opentelemetry.sdk.trace import TracerProvider
+                    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+                except ImportError:
+                    _otel_failed = True
+                    return None
+                _provider = TracerProvider(resource=Resource.create({'service.name': SERVICE_NAME}))
+                _provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTLP_ENDPOINT)))
+                _tracer = _provider.get_tracer(__name__)
+    return _tracer
+
+def shutdown_tracing():
+    """Envoie les spans en attente au collecteur (à l'arrêt du processus)"""
+    if _provider is not None:
+        _provider.shutdown()
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Dict]:
+    """
+    Span autour d'un bloc, enfant du span courant (local et OpenTelemetry)
+
+    Produit le dict des attributs, que le bloc peut compléter (ex. page servie par le cache).
+    """
+    tracer = get_tracer()
+    current = _current.get()
+    if tracer is None and current is None:
+        yield attributes
+        return
+
+    token = None
+    if current is not None:
+        recorder, parent = current
+        span_id = recorder.new_id()
+        token = _current.set((recorder, span_id))
+    start_ns = time.time_ns()
+    try:
+        if tracer is not None:
+            with tracer.start_as_current_span(name) as otel_span:
+                try:
+                    yield attributes
+                finally:
+                    otel_span.set_attributes(attributes)
+        else:
+            yield attributes
+    finally:
+        if token is not None:
+            _current.reset(token)
+            recorder.add(span_id, parent, name, start_ns, time.time_ns(), attributes)
+
+def add_stage_spans(durations: Dict[str, float], **attributes):
+    """
+    Spans enfants du span courant pour des durées mesurées ailleurs (pool d'analyse) :
+    cumulées sur les blocs de la page, elles sont placées bout à bout et finissent maintenant
+    """
+    tracer = get_tracer()
+    current = _current.get()
+    if tracer is None and current is None:
+        return
+
+    end_ns = time.time_ns()
+    start_ns = end_ns - int(sum(durations.values()) * 1e9)
+    for name, seconds in durations.items():
+        stage_end = start_ns + int(seconds * 1e9)
+        if tracer is not None:
+            tracer.start_span(name, attributes=attributes, start_time=start_ns).end(end_time=stage_end)
+        if current is not None:
+            recorder, parent = current
+            recorder.add(recorder.new_id(), parent, name, start_ns, stage_end, attributes)
+        start_ns = stage_end
+
+@contextmanager
+def record_spans(recorder: SpanRecorder) -> Iterator[SpanRecorder]:
+    """Enregistre dans `recorder` les spans ouverts dans ce contexte"""
+    token = _current.set((recorder, None))
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)